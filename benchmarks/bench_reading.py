@@ -0,0 +1,28 @@
+"""
+speed and memory of the reader, on synthetic workbooks
+
+see the benchmark targets of the Makefile. Every shape is read by every
+target; rows per second, time to the first row and peak RSS end up in
+the extra_info of each saved run.
+"""
+
+import os
+
+import pytest
+from measure import TARGETS, read_all, measure_in_child
+from workbooks import SHAPES, make_workbook
+
+ROUNDS = int(os.environ.get("BENCHMARK_ROUNDS", "3"))
+
+
+@pytest.mark.parametrize("target", list(TARGETS))
+@pytest.mark.parametrize("shape", list(SHAPES))
+def test_reading(benchmark, shape, target):
+    file_name = make_workbook(shape)
+    benchmark.group = shape
+    rows = benchmark.pedantic(
+        read_all, args=(target, file_name), rounds=ROUNDS, iterations=1
+    )
+    benchmark.extra_info["rows"] = rows
+    benchmark.extra_info["rows_per_second"] = rows / benchmark.stats["min"]
+    benchmark.extra_info.update(measure_in_child(target, file_name))
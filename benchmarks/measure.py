@@ -0,0 +1,113 @@
+"""
+what the benchmarks read, and how memory and the first row are measured
+
+every target yields rows, or strings for the shared strings stage, so
+that they are timed and counted alike. measure() runs in a fresh
+process, spawned per call, so that its peak RSS is its own.
+"""
+
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from pyexcel_io import iget_data
+from pyexcel_io.io import get_data
+from pyexcel_xlsxr.messy_xlsx import (
+    SHARED_STRING,
+    XLSXBookSet,
+    find_sheets,
+    iter_sheet_rows,
+    parse_shared_strings,
+)
+
+try:
+    import resource
+except ImportError:
+    # not on windows
+    resource = None
+
+
+def read_get_data(file_name):
+    """the whole pyexcel-io path, every sheet in memory first"""
+    for rows in get_data(file_name, library="pyexcel-xlsxr").values():
+        yield from rows
+
+
+def read_iget_data(file_name):
+    """the streaming pyexcel-io path"""
+    data, reader = iget_data(file_name, library="pyexcel-xlsxr")
+    try:
+        for rows in data.values():
+            yield from rows
+    finally:
+        reader.close()
+
+
+def read_book_set(file_name):
+    """XLSXBookSet alone, rows decoded but not converted by pyexcel-io"""
+    book = XLSXBookSet(file_name)
+    try:
+        for table in book.make_tables():
+            yield from table.raw()
+    finally:
+        book.close()
+
+
+def read_shared_strings(file_name):
+    """the shared strings stage"""
+    with zipfile.ZipFile(file_name) as zip_file:
+        if SHARED_STRING in zip_file.namelist():
+            with zip_file.open(SHARED_STRING) as content:
+                yield from parse_shared_strings(content)
+
+
+def read_xml_rows(file_name):
+    """the xml stage, <row> elements walked but not decoded"""
+    with zipfile.ZipFile(file_name) as zip_file:
+        for sheet_file in find_sheets(zip_file.namelist()):
+            with zip_file.open(sheet_file) as content:
+                yield from iter_sheet_rows(content)
+
+
+TARGETS = {
+    "get_data": read_get_data,
+    "iget_data": read_iget_data,
+    "book_set": read_book_set,
+    "shared_strings": read_shared_strings,
+    "xml_rows": read_xml_rows,
+}
+
+
+def read_all(target, file_name):
+    """read everything, return how many rows there were"""
+    count = 0
+    for _ in TARGETS[target](file_name):
+        count += 1
+    return count
+
+
+def measure(target, file_name):
+    """time to the first row and peak RSS in kilobytes, in this process"""
+    rss_before = peak_rss()
+    started = time.perf_counter()
+    rows = TARGETS[target](file_name)
+    next(rows, None)
+    first_row_seconds = time.perf_counter() - started
+    for _ in rows:
+        pass
+    measures = {"first_row_seconds": first_row_seconds}
+    if resource is not None:
+        measures["peak_rss_kb"] = peak_rss()
+        measures["peak_rss_growth_kb"] = peak_rss() - rss_before
+    return measures
+
+
+def measure_in_child(target, file_name):
+    with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(measure, target, file_name).result()
+
+
+def peak_rss():
+    # kilobytes on linux, bytes on macos
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
@@ -0,0 +1,99 @@
+"""
+synthetic workbooks for the benchmarks
+
+each shape stresses one part of the reader. They are written with
+xlsxwriter, which pyexcel-xlsxw brings along, and cached on disk since
+the big ones take a while to write. BENCHMARK_SCALE=0.1 makes every
+workbook ten times smaller.
+"""
+
+import os
+import random
+from datetime import date, timedelta
+
+import xlsxwriter
+
+SCALE = float(os.environ.get("BENCHMARK_SCALE", "1"))
+CACHE_DIR = os.path.join(os.path.dirname(__file__), ".workbooks")
+
+
+def scaled(count):
+    return max(1, int(count * SCALE))
+
+
+def write_tall(book):
+    """numbers and short text in a few columns, many rows"""
+    worksheet = book.add_worksheet()
+    for row in range(scaled(200000)):
+        worksheet.write_row(row, 0, [row, row * 1.5, "r%d" % (row % 50), -row])
+
+
+def write_wide(book):
+    """numbers in many columns, fewer rows"""
+    worksheet = book.add_worksheet()
+    for row in range(scaled(2000)):
+        worksheet.write_row(row, 0, [row * column for column in range(500)])
+
+
+def write_strings(book):
+    """mostly unique shared strings"""
+    worksheet = book.add_worksheet()
+    for row in range(scaled(100000)):
+        worksheet.write_row(
+            row, 0, ["name %d" % row, "city %d" % (row % 997), "id-%08d" % row]
+        )
+
+
+def write_dates(book):
+    """date formatted cells, with dates that repeat like in a ledger"""
+    worksheet = book.add_worksheet()
+    date_format = book.add_format({"num_format": "yyyy-mm-dd"})
+    time_format = book.add_format({"num_format": "hh:mm:ss"})
+    start = date(2020, 1, 1)
+    for row in range(scaled(100000)):
+        day = start + timedelta(days=row % 2000)
+        worksheet.write_datetime(row, 0, day, date_format)
+        worksheet.write_datetime(row, 1, day, date_format)
+        worksheet.write_number(row, 2, (row % 86400) / 86400, time_format)
+
+
+def write_sparse(book):
+    """few cells spread over many columns, with gaps between rows"""
+    worksheet = book.add_worksheet()
+    randomizer = random.Random(0)
+    for row in range(0, scaled(100000), 2):
+        for column in randomizer.sample(range(1000), 5):
+            worksheet.write_number(row, column, row + column)
+
+
+def write_many_sheets(book):
+    """many small sheets"""
+    for index in range(100):
+        worksheet = book.add_worksheet()
+        for row in range(scaled(1000)):
+            worksheet.write_row(row, 0, [index, row, "s%d" % row])
+
+
+SHAPES = {
+    "tall": write_tall,
+    "wide": write_wide,
+    "strings": write_strings,
+    "dates": write_dates,
+    "sparse": write_sparse,
+    "many_sheets": write_many_sheets,
+}
+
+
+def make_workbook(shape):
+    """the path of the workbook of a shape, written on first use"""
+    file_name = os.path.join(CACHE_DIR, "%s-%s.xlsx" % (shape, SCALE))
+    if os.path.exists(file_name):
+        return file_name
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    partial_name = file_name.replace(".xlsx", ".partial.xlsx")
+    # an interrupted run must not leave a broken workbook in the cache
+    book = xlsxwriter.Workbook(partial_name)
+    SHAPES[shape](book)
+    book.close()
+    os.replace(partial_name, file_name)
+    return file_name
@@ -6,10 +6,13 @@ The lower level xlsx file format handler using lxml
 :license: New BSD License
 """
 
+from io import BytesIO
+
 from pyexcel_io.io import get_data as read_data
 from pyexcel_io.io import isstream
 from pyexcel_io.plugins import IOPluginInfoChainV2
 from pyexcel_xlsxr._version import __author__, __version__  # noqa
+from pyexcel_xlsxr.messy_xlsx import read_metadata
 
 __FILE_TYPE__ = "xlsx"
 
@@ -30,4 +33,23 @@ def get_data(afile, file_type=None, **keywords):
     """standalone module function for reading module supported file type"""
     if isstream(afile) and file_type is None:
         file_type = __FILE_TYPE__
+    # pyexcel-io keeps the row and column window to itself, the sheet
+    # is told too, to seek with the row index and skip unwanted cells
+    if keywords.get("row_index") and "seek_row" not in keywords:
+        keywords["seek_row"] = keywords.get("start_row", 0)
+    if "column_window" not in keywords:
+        keywords["column_window"] = (
+            keywords.get("start_column", 0),
+            keywords.get("column_limit", -1),
+        )
     return read_data(afile, file_type=file_type, **keywords)
+
+
+def get_metadata(afile):
+    """
+    the sheets of a workbook, by name, with their visibility, dimension
+    and sizes, without reading any cell, see messy_xlsx.read_metadata()
+    """
+    if isinstance(afile, bytes):
+        afile = BytesIO(afile)
+    return read_metadata(afile)
@@ -0,0 +1,209 @@
+"""
+pyexcel_xlsxr.cache
+~~~~~~~~~~~~~~~~~~~
+Keep parsed workbooks around between reads
+:copyright: (c) 2015-2020 by Onni Software Ltd & its contributors
+:license: New BSD License
+"""
+
+import os
+import stat
+import pickle
+import hashlib
+import threading
+from functools import partial
+from collections import OrderedDict
+
+from pyexcel_xlsxr.files import atomic_write
+
+# how many bytes of pickled entries are kept in memory by default
+CACHE_SIZE = 256 * 1024 * 1024
+# how many bytes are hashed at a time to key a stream
+HASH_CHUNK_SIZE = 1024 * 1024
+CACHE_FILE_SUFFIX = ".xlsxcache"
+
+
+class WorkbookCache(object):
+    """
+    parsed workbooks, shared by every XLSXBookSet given this cache
+
+    entries are the styles, properties and shared strings of a workbook,
+    each put when it is first used, and, with cache_sheets, the decoded
+    rows of the sheets read in full. They are kept as they are, shared
+    by every reader, and evicted least recently used first once their
+    pickled sizes add up to max_bytes. With a directory, they are
+    pickled there too and outlive the process, up to max_disk_bytes.
+
+    loading a pickle runs code, so the directory must be private: it is
+    created with mode 0o700, and a directory or file that belongs to
+    another user, or that others may write to, is never loaded.
+
+    files given by path are keyed by their path, modification time and
+    size, unless hash_files is set. Streams are keyed by a hash of their
+    content.
+    """
+
+    def __init__(
+        self,
+        max_bytes=CACHE_SIZE,
+        directory=None,
+        max_disk_bytes=None,
+        cache_sheets=False,
+        hash_files=False,
+    ):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.cache_sheets = cache_sheets
+        self.hash_files = hash_files
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def key_for(self, file_alike):
+        if isinstance(file_alike, (str, os.PathLike)):
+            if not self.hash_files:
+                stat = os.stat(file_alike)
+                source = "%s:%d:%d" % (
+                    os.path.abspath(file_alike),
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                )
+                return hashlib.sha256(source.encode("utf-8")).hexdigest()
+            with open(file_alike, "rb") as stream:
+                return hash_stream(stream)
+        return hash_stream(file_alike)
+
+    def get(self, key):
+        with self.lock:
+            cached = self.entries.get(key)
+            if cached is not None:
+                self.entries.move_to_end(key)
+                return cached[0]
+        if not self.directory:
+            return None
+        data = self.__load(key)
+        if data is None:
+            return None
+        try:
+            entry = pickle.loads(data)
+        except Exception:
+            # e.g. truncated, or pickled by another version, it counts
+            # as a miss and is put again once parsed
+            self.__discard(key)
+            return None
+        self.__remember(key, entry, len(data))
+        return entry
+
+    def put(self, key, entry):
+        data = pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)
+        self.__remember(key, entry, len(data))
+        if self.directory:
+            self.__save(key, data)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def __remember(self, key, entry, size):
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self.entries[key] = (entry, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def __path(self, key):
+        return os.path.join(self.directory, key + CACHE_FILE_SUFFIX)
+
+    def __load(self, key):
+        path = self.__path(key)
+        try:
+            with open(path, "rb") as cache_file:
+                if not is_private(self.directory) or not is_private(
+                    cache_file.fileno()
+                ):
+                    return None
+                data = cache_file.read()
+            # the modification time tells the disk eviction what was used
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def __discard(self, key):
+        try:
+            os.remove(self.__path(key))
+        except OSError:
+            pass
+
+    def __save(self, key, data):
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            with atomic_write(self.__path(key)) as cache_file:
+                cache_file.write(data)
+        except OSError:
+            # e.g. a full or read only disk, the memory cache still works
+            return
+        if self.max_disk_bytes is not None:
+            self.__prune()
+
+    def __prune(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(CACHE_FILE_SUFFIX):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    # pruned by another process meanwhile
+                    continue
+                files.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= size
+
+
+def is_private(path_or_descriptor):
+    """whether a path, or an open file, is the user's alone to write"""
+    if not hasattr(os, "getuid"):
+        # no owners to check, e.g. on windows
+        return True
+    status = os.stat(path_or_descriptor)
+    others_may_write = status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    return status.st_uid == os.getuid() and not others_may_write
+
+
+def hash_stream(stream):
+    """a sha256 of the whole stream, which is left where it was"""
+    position = stream.tell()
+    stream.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(partial(stream.read, HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    stream.seek(position)
+    return digest.hexdigest()
+
+
+def sheet_key(book_key, sheet_file, parse_number):
+    """the key of the decoded rows of a sheet, as numbers are parsed"""
+    name = getattr(parse_number, "__name__", None)
+    source = "%s:%s:%s" % (book_key, sheet_file, name)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def member_key(book_key, member):
+    """the key of what was parsed from a member of a workbook"""
+    source = "%s:%s" % (book_key, member)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
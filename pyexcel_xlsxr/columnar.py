@@ -0,0 +1,386 @@
+"""
+pyexcel_xlsxr.columnar
+~~~~~~~~~~~~~~~~~~~
+Read a worksheet into typed, per column buffers
+:copyright: (c) 2015-2020 by Onni Software Ltd & its contributors
+:license: New BSD License
+"""
+
+from array import array
+from datetime import datetime, timedelta
+from itertools import chain
+
+from pyexcel_xlsxr.messy_xlsx import (
+    VALUE_TAGS,
+    iter_cells,
+    decode_cell,
+    parse_cell_type,
+    parse_cell_value,
+    parse_numeric_cell_value,
+)
+
+FLOAT_COLUMN = "float"
+DATETIME_COLUMN = "datetime"
+OBJECT_COLUMN = "object"
+# days from each spreadsheet epoch to 1970-01-01
+UNIX_EPOCH_IN_1900_SYSTEM = 25569
+UNIX_EPOCH_IN_1904_SYSTEM = 24107
+MICROSECONDS_IN_A_DAY = 24 * 60 * 60 * 1000 * 1000
+UNIX_EPOCH = datetime(1970, 1, 1)
+# a cell without a t attribute is a number
+NUMERIC_TYPES = (None, "n")
+# rows per arrow record batch, and rows looked at to infer the schema
+RECORD_BATCH_SIZE = 64 * 1024
+INFER_ROWS = 1024
+
+
+class Column(object):
+    """
+    the cells of one column, in typed storage
+
+    float columns keep their values in an array('d'), and so do datetime
+    columns, as days since 1970-01-01 that are turned into datetime64
+    or timestamps in bulk. The mask has a 1 for every empty cell. A
+    column falls back to a list of python objects, once, when it meets
+    a cell of another kind.
+    """
+
+    def __init__(self):
+        self.kind = None
+        self.values = None
+        self.mask = array("B")
+
+    def __len__(self):
+        return len(self.mask)
+
+    def pad(self, length):
+        missing = length - len(self.mask)
+        if missing > 0:
+            self.mask.extend(bytes([1]) * missing)
+            if self.kind is not None:
+                self.values.extend(empty_values(self.kind, missing))
+
+    def append(self, kind, value):
+        if self.kind != kind:
+            if self.kind is None:
+                self.kind = kind
+                self.values = empty_values(kind, len(self.mask))
+            elif self.kind != OBJECT_COLUMN:
+                self.values = self.to_list()
+                self.kind = OBJECT_COLUMN
+        if self.kind == OBJECT_COLUMN:
+            value = to_object(kind, value)
+        self.values.append(value)
+        self.mask.append(0)
+
+    def to_numpy(self):
+        """
+        a numpy masked array: float64, datetime64[us] or object
+
+        float buffers are wrapped, not copied, and dates are converted
+        in one go.
+        """
+        numpy = import_numpy()
+        if self.kind == FLOAT_COLUMN:
+            data = numpy.frombuffer(self.values, dtype=numpy.float64)
+        elif self.kind == DATETIME_COLUMN:
+            days = numpy.frombuffer(self.values, dtype=numpy.float64)
+            microseconds = numpy.rint(days * MICROSECONDS_IN_A_DAY)
+            data = microseconds.astype("datetime64[us]")
+        else:
+            data = numpy.empty(len(self.mask), dtype=object)
+            if self.values is not None:
+                data[:] = self.values
+        mask = numpy.frombuffer(self.mask, dtype=numpy.bool_)
+        return numpy.ma.MaskedArray(data, mask=mask)
+
+    def to_list(self):
+        """the column as python values, None for empty cells"""
+        if self.kind is None:
+            return [None] * len(self.mask)
+        return [
+            None if missing else to_object(self.kind, value)
+            for value, missing in zip(self.values, self.mask)
+        ]
+
+
+def empty_values(kind, length):
+    if kind in (FLOAT_COLUMN, DATETIME_COLUMN):
+        return array("d", bytes(8 * length))
+    return [None] * length
+
+
+def to_object(kind, value):
+    if kind == DATETIME_COLUMN:
+        return UNIX_EPOCH + timedelta(days=value)
+    return value
+
+
+def read_columns(table, columns=None, start_row=0):
+    """
+    read the sheet of an XLSXTable into a list of Column, in one pass
+
+    columns, see XLSXTable.resolve_columns(), selects and orders the
+    columns. Otherwise the list is indexed by column, starting at A.
+    Rows before start_row, e.g. a header, are left out.
+    """
+    blocks = iter_column_blocks(table, columns, start_row)
+    for _, result in blocks:
+        return result
+    return []
+
+
+def iter_column_blocks(table, columns=None, start_row=0, block_size=None):
+    """
+    yield the row count and a list of Column for every block_size rows
+
+    see read_columns(). Without a block_size, the whole sheet is one
+    block.
+    """
+    book = table.book
+    if book.date1904:
+        epoch = UNIX_EPOCH_IN_1904_SYSTEM
+    else:
+        epoch = UNIX_EPOCH_IN_1900_SYSTEM
+    if columns:
+        last_column_number = max(columns)
+    result = None
+    row_count = 0
+    first_row, rows = table.rows_from(start_row)
+    for index, row in enumerate(rows, first_row):
+        if index < start_row:
+            continue
+        if result is None:
+            result = [Column() for _ in columns or ()]
+        for column_number, element in iter_cells(row):
+            if columns:
+                if column_number > last_column_number:
+                    break
+                position = columns.get(column_number)
+                if position is None:
+                    continue
+            else:
+                position = column_number - 1
+                while len(result) <= position:
+                    result.append(Column())
+            kind, value = decode_typed_cell(element, book, epoch)
+            if kind is not None:
+                column = result[position]
+                column.pad(row_count)
+                column.append(kind, value)
+        row_count += 1
+        if row_count == block_size:
+            yield close_block(result, row_count)
+            result = None
+            row_count = 0
+    if result is not None:
+        yield close_block(result, row_count)
+
+
+def close_block(result, row_count):
+    for column in result:
+        column.pad(row_count)
+    return row_count, result
+
+
+def decode_typed_cell(element, book, epoch):
+    """
+    the column kind and the typed value of a cell
+
+    numbers go straight from the xml text into a float, and dates into
+    days since 1970, without going through a datetime.
+    """
+    value = None
+    for node in element.iter(*VALUE_TAGS):
+        value = node.text
+    if not value:
+        return None, None
+    attributes = element.attrib
+    xml_type = attributes.get("t")
+    cell_type = None
+    style_int = attributes.get("s")
+    if style_int:
+        style_type = book.cell_types[int(style_int)]
+        cell_type = parse_cell_type(style_type, value)
+    if xml_type in NUMERIC_TYPES:
+        if cell_type == "time":
+            time_value = parse_numeric_cell_value(value, cell_type, book)
+            return OBJECT_COLUMN, time_value
+        try:
+            if cell_type == "date":
+                return DATETIME_COLUMN, float(value) - epoch
+            return FLOAT_COLUMN, float(value)
+        except (ValueError, OverflowError):
+            return OBJECT_COLUMN, value
+    return (
+        OBJECT_COLUMN,
+        parse_cell_value(value, xml_type, cell_type, book),
+    )
+
+
+def iter_record_batches(
+    table,
+    batch_size=RECORD_BATCH_SIZE,
+    columns=None,
+    start_row=0,
+    header=False,
+    infer_rows=INFER_ROWS,
+):
+    """
+    yield pyarrow RecordBatches of at most batch_size rows
+
+    the schema is inferred from the first batches, covering at least
+    infer_rows rows. A column of
+    numbers is float64, or timestamp[us] when the cellXfs styles say
+    date, and any other column is a string. Fields are named after the
+    column letters, or after the first row when header is set.
+    """
+    import_pyarrow()
+    names = {}
+    if header:
+        names = header_names(table, columns, start_row)
+        start_row += 1
+    blocks = iter_column_blocks(table, columns, start_row, batch_size)
+    inferred = []
+    inferred_rows = 0
+    for block in blocks:
+        inferred.append(block)
+        inferred_rows += block[0]
+        if inferred_rows >= infer_rows:
+            break
+    schema = infer_schema([result for _, result in inferred], columns, names)
+    for row_count, result in chain(inferred, blocks):
+        yield to_record_batch(row_count, result, schema)
+
+
+def header_names(table, columns, start_row):
+    """the first row as {position: name}"""
+    first_row, rows = table.rows_from(start_row)
+    for index, row in enumerate(rows, first_row):
+        if index < start_row:
+            continue
+        names = {}
+        for column_number, element in iter_cells(row):
+            if columns:
+                position = columns.get(column_number)
+                if position is None:
+                    continue
+            else:
+                position = column_number - 1
+            value = decode_cell(element, table.book)
+            if value != "":
+                names[position] = str(value)
+        return names
+    return {}
+
+
+def infer_schema(results, columns, names):
+    pyarrow = import_pyarrow()
+    if columns:
+        numbers = {position: number for number, position in columns.items()}
+        width = len(columns)
+    else:
+        numbers = {}
+        width = max((len(result) for result in results), default=0)
+    fields = []
+    for position in range(width):
+        kinds = set(
+            result[position].kind
+            for result in results
+            if position < len(result)
+        )
+        kinds.discard(None)
+        if kinds == {FLOAT_COLUMN}:
+            arrow_type = pyarrow.float64()
+        elif kinds == {DATETIME_COLUMN}:
+            arrow_type = pyarrow.timestamp("us")
+        else:
+            arrow_type = pyarrow.string()
+        name = names.get(position)
+        if name is None:
+            name = column_letters(numbers.get(position, position + 1))
+        fields.append(pyarrow.field(name, arrow_type))
+    return pyarrow.schema(fields)
+
+
+def to_record_batch(row_count, result, schema):
+    pyarrow = import_pyarrow()
+    width = len(schema)
+    for column in result[width:]:
+        if column.kind is not None:
+            raise ValueError(
+                "Values found past the inferred schema, "
+                + "please raise infer_rows or pass columns"
+            )
+    arrays = []
+    for position, field in enumerate(schema):
+        if position < len(result) and result[position].kind is not None:
+            arrays.append(to_arrow(result[position], field.type))
+        else:
+            arrays.append(pyarrow.nulls(row_count, field.type))
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def to_arrow(column, arrow_type):
+    """
+    an arrow array of the column
+
+    typed columns hand their buffers over as they are, and dates are
+    converted in bulk. Other columns are converted value by value.
+    """
+    pyarrow = import_pyarrow()
+    typed = (column.kind, arrow_type) in (
+        (FLOAT_COLUMN, pyarrow.float64()),
+        (DATETIME_COLUMN, pyarrow.timestamp("us")),
+    )
+    if typed:
+        mask = pyarrow.Array.from_buffers(
+            pyarrow.uint8(),
+            len(column),
+            [None, pyarrow.py_buffer(column.mask)],
+        )
+        validity = pyarrow.compute.equal(mask, 0).buffers()[1]
+        arrow_array = pyarrow.Array.from_buffers(
+            pyarrow.float64(),
+            len(column),
+            [validity, pyarrow.py_buffer(column.values)],
+        )
+        if column.kind == DATETIME_COLUMN:
+            arrow_array = pyarrow.compute.round(
+                pyarrow.compute.multiply(arrow_array, MICROSECONDS_IN_A_DAY)
+            )
+            arrow_array = arrow_array.cast(pyarrow.int64()).cast(arrow_type)
+        return arrow_array
+    values = column.to_list()
+    if arrow_type == pyarrow.string():
+        values = [None if value is None else str(value) for value in values]
+    return pyarrow.array(values, type=arrow_type)
+
+
+def column_letters(number):
+    letters = ""
+    while number:
+        number, remainder = divmod(number - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+# numpy and pyarrow are imported on first use, so that reading rows
+# never pays for them
+
+
+def import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Please install numpy for to_numpy()")
+    return numpy
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute  # noqa: F401
+    except ImportError:
+        raise ImportError("Please install pyarrow for record batches")
+    return pyarrow
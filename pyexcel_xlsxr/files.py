@@ -0,0 +1,35 @@
+"""
+pyexcel_xlsxr.files
+~~~~~~~~~~~~~~~~~~~
+Write the files kept next to workbooks or in a cache directory
+:copyright: (c) 2015-2020 by Onni Software Ltd & its contributors
+:license: New BSD License
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_write(path):
+    """
+    a binary file that replaces path once it is written in full
+
+    it is a unique temporary file in the folder of path, as other
+    processes may write the same path at the same time, and it is
+    removed if writing fails, e.g. on a full disk.
+    """
+    handle, temporary_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path))
+    )
+    try:
+        with os.fdopen(handle, "wb") as output:
+            yield output
+        os.replace(temporary_path, path)
+    except BaseException:
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+        raise
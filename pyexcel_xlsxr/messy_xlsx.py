@@ -1,10 +1,28 @@
 import io
+import os
 import re
+import zlib
+import mmap
+import pickle
+import shutil
+import struct
+import bisect
+import copyreg
+import hashlib
 import zipfile
+import tempfile
+from array import array
+from itertools import chain, islice
+from functools import partial
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import time, datetime, timedelta
-from functools import cache
+from functools import cache, lru_cache, cached_property
 
 from lxml import etree
+from pyexcel_xlsxr.cache import sheet_key, member_key
+from pyexcel_xlsxr.files import atomic_write
+from pyexcel_xlsxr.sidecar import load_sidecar, save_sidecar
 from pyexcel_io._compact import OrderedDict
 
 STYLE_FILENAME = "xl/styles.xml"
@@ -16,9 +34,77 @@ NUMBER_FMT_MATCHER = re.compile(rb"<numFmts\b[^>]*>.*?</numFmts>", re.DOTALL)
 XFS_FMT_MATCHER = re.compile(rb"<cellXfs\b[^>]*>.*?</cellXfs>", re.DOTALL)
 SHEET_FMT_MATCHER = re.compile(rb"<sheet\b.*?/>", re.DOTALL)
 DATE_1904_MATCHER = re.compile(rb"<workbookPr\b.*?/>", re.DOTALL)
+SHEET_DATA_MATCHER = re.compile(rb"<((?:\w+:)?sheetData)\b[^>]*?(/?)>")
+ROW_START_MATCHER = re.compile(rb"<row\b")
+# a whole <row>, self-closing or not, with or without a namespace prefix
+SHEET_ROW_MATCHER = re.compile(
+    rb"<((?:\w+:)?row)\b[^>]*?(?:/>|>.*?</\1>)", re.DOTALL
+)
+SHEET_ROW_START_MATCHER = re.compile(rb"<(?:\w+:)?row\b")
+ROOT_TAG_MATCHER = re.compile(rb"<([\w:]+)[\s>]")
+DIMENSION_MATCHER = re.compile(
+    rb"<(?:\w+:)?dimension\b[^>]*?\bref=\"([^\"]*)\""
+)
+SHARED_STRINGS_ROOT_MATCHER = re.compile(rb"<((?:\w+:)?sst)\b[^>]*>")
+SHARED_STRING_MATCHER = re.compile(rb"<(?:\w+:)?si[\s/>]")
+CELL_REFERENCE_MATCHER = re.compile(r"^\$?([A-Za-z]{1,3})\$?([0-9]+)$")
 # "xmlns:x14ac="http://schemas.microsoft.com/office/spreadsheetml/2009/9/ac"
 # But it not used for now
 X14AC_NAMESPACE = b'xmlns:x14ac="http://not.used.com/"'
+# namespace agnostic tags, so that fragments without xmlns match as well
+ROW_TAG = "{*}row"
+CELL_TAG = "{*}c"
+VALUE_TAGS = ("{*}v", "{*}t")
+SHARED_STRING_TAG = "{*}si"
+DIGITS = "0123456789"
+COLUMN_LETTERS_MATCHER = re.compile(r"^[A-Za-z]{1,3}$")
+DATE_STYLE_MATCHER = re.compile(r".*[hsmdyY]")
+DURATION_STYLE_MATCHER = re.compile(r".*\[.*[dmhys].*\]")
+DATE_VALUE_MATCHER = re.compile(r"^\d+(\.\d+)?$")
+FLOAT_VALUE_MATCHER = re.compile(r"^-?\d+(.\d+)?$")
+INT_VALUE_MATCHER = re.compile(r"^-?\d+$")
+# cell types that can only be settled by looking at the cell value
+DATE_OR_FLOAT = "date_or_float"
+FLOAT_OR_TEXT = "float_or_text"
+# how many decompressed bytes are pulled from a sheet member at a time
+CHUNK_SIZE = 64 * 1024
+# how many decompressed bytes of rows go to one pool worker at a time
+SHEET_CHUNK_SIZE = 4 * 1024 * 1024
+# day zero of the 1900 and the 1904 date systems, by date1904
+EPOCHS = {False: datetime(1899, 12, 30), True: datetime(1904, 1, 1)}
+# how many distinct date and time cell values are kept converted
+DATE_CACHE_SIZE = 16384
+# how many rows iter_row_blocks() hands over at a time
+ROW_BLOCK_SIZE = 10000
+# how many decoded shared strings are kept around for repeated lookups
+SHARED_STRINGS_CACHE_SIZE = 4096
+# how many offsets are buffered before being spilled to disk
+SPILL_BATCH_SIZE = 64 * 1024
+# where the shared strings table is kept, see XLSXBookSet
+SHARED_STRINGS_IN_MEMORY = "memory"
+SHARED_STRINGS_ON_DISK = "disk"
+SHARED_STRINGS_INDEXED = "index"
+# non-seekable streams bigger than this are spooled to disk, not to memory
+SPOOL_THRESHOLD = 16 * 1024 * 1024
+# the attributes of XLSXBookSet that are parsed on first use
+LAZY_PARTS = [
+    "styles",
+    "xfs_styles",
+    "cell_types",
+    "properties",
+    "date1904",
+    "shared_strings",
+]
+# how much of a sheet is read at a time while looking for its dimension
+HEAD_CHUNK_SIZE = 4 * 1024
+# zip local file header: signature, fixed fields, then name and extra sizes
+LOCAL_FILE_HEADER = struct.Struct("<4s22xHH")
+LOCAL_FILE_HEADER_SIGNATURE = b"PK\x03\x04"
+# how many decompressed bytes apart the rows of a row index are
+ROW_INDEX_INTERVAL = 4 * 1024 * 1024
+# persisted row index: magic, member crc and size, header size, row count
+ROW_INDEX_HEADER = struct.Struct("<8sIQQQ")
+ROW_INDEX_MAGIC = b"XLSXRIX1"
 
 # see also ruby-roo lib at: http://github.com/hmcgowan/roo
 FORMATS = {
@@ -101,52 +187,1306 @@ STANDARD_FORMATS = {
 
 
 class XLSXTable(object):
-    def __init__(self, name, file_content, book):
+    """
+    a lazy handle on one worksheet
+
+    the zip member is only opened, and decompressed, when raw() is
+    iterated, so sheets that are never read cost nothing.
+    """
+
+    def __init__(self, name, sheet_file, book):
         self.name = name
-        self.content = file_content
+        self.sheet_file = sheet_file
         self.book = book
+        self._row_index = None
+
+    def raw(
+        self,
+        start_row=0,
+        row_limit=-1,
+        start_column=0,
+        column_limit=-1,
+        columns=None,
+    ):
+        """
+        yield decoded rows, limited the same way pyexcel-io limits them
+
+        rows before start_row are skipped without being decoded, the
+        sheet is no longer read once row_limit is reached, and cells
+        outside the column window are never converted. With a row
+        index, reading starts at the nearest indexed row instead.
+        columns, see resolve_columns(), keeps only the given columns.
+        Whole sheets come from the book's cache or sidecar files, when
+        it keeps them, see stored_rows().
+        """
+        window = start_row or start_column or max(row_limit, column_limit) > -1
+        if not (window or columns):
+            rows = self.stored_rows()
+            if rows is not None:
+                yield from rows
+                return
+        first_row, rows = self.rows_from(start_row)
+        for index, row in enumerate(rows, first_row):
+            if index < start_row:
+                continue
+            if row_limit > -1 and index >= start_row + row_limit:
+                break
+            yield decode_row(
+                row, self.book, start_column, column_limit, columns
+            )
+
+    def stored_rows(self):
+        """
+        the decoded rows of the whole sheet, if the book keeps them in
+        its cache or in sidecar files, else None
+        """
+        if self.book.caches_sheets():
+            # copies, the cached rows are shared with every reader
+            return map(list, self.cached_rows())
+        if self.book.use_sidecar:
+            return self.sidecar_rows()
+        return None
+
+    def cached_rows(self):
+        """the decoded rows of the whole sheet, from the cache or not"""
+        key = sheet_key(
+            self.book.cache_key, self.sheet_file, self.book.parse_number
+        )
+        rows = self.book.cache.get(key)
+        if rows is None:
+            if self.book.use_sidecar:
+                rows = list(self.sidecar_rows())
+            else:
+                rows = [decode_row(row, self.book) for row in self.rows()]
+            self.book.cache.put(key, rows)
+        return rows
+
+    def sidecar_rows(self):
+        """
+        the decoded rows of the whole sheet, from its sidecar file
+
+        the sidecar is written on the first read, and then used for as
+        long as the sheet and the parts its values depend on are the
+        same, see XLSXBookSet.sidecar_signature().
+        """
+        info = self.book.zip_file.getinfo(self.sheet_file)
+        path = self.book.sidecar_path(self.sheet_file, info)
+        if path is None:
+            return (decode_row(row, self.book) for row in self.rows())
+        signature = self.book.sidecar_signature(info)
+        parser_code = NUMBER_PARSERS.index(self.book.parse_number)
+        rows = load_sidecar(path, signature, parser_code)
+        if rows is None:
+            rows = [decode_row(row, self.book) for row in self.rows()]
+            try:
+                save_sidecar(path, rows, signature, parser_code)
+            except OSError:
+                # e.g. a read only folder, the rows are still good
+                pass
+            rows = iter(rows)
+        return rows
+
+    def iter_row_blocks(self, size=ROW_BLOCK_SIZE, columns=None):
+        """yield lists of at most size decoded rows, see raw()"""
+        return iter_blocks(self.raw(columns=columns), size)
+
+    def rows(self):
+        """
+        yield undecoded <row> elements, see decode()
+
+        each element is detached from the parsed tree once the next one
+        is asked for, so it stays whole for as long as it is kept.
+        """
+        with self.book.open_member(self.sheet_file) as content:
+            yield from iter_sheet_rows(content)
+
+    def rows_from(self, start_row):
+        """
+        undecoded rows from the nearest indexed row before start_row
+
+        returns the ordinal of the first row along with the rows.
+        """
+        row_index = None
+        if start_row and self.book.use_row_index:
+            row_index = self.row_index()
+        entry = row_index.find(start_row) if row_index else None
+        if entry is None:
+            return 0, self.rows()
+        ordinal, offset, checkpoint = entry
+        return ordinal, self.__resume(row_index.header, offset, checkpoint)
+
+    def __resume(self, header, offset, checkpoint):
+        if checkpoint:
+            position, decompressor, skip = checkpoint
+            if decompressor:
+                decompressor = decompressor.copy()
+            info = self.book.zip_file.getinfo(self.sheet_file)
+            inflated = inflate_member(
+                self.book.zip_file.fp, info, position, decompressor
+            )
+            chunks = (data for _, _, data in inflated)
+            # the chunk the row starts in, inflated again
+            first = next(chunks)[skip:]
+            chunks = chain([header, first], chunks)
+            yield from iter_sheet_rows(IterStream(chunks))
+        else:
+            # a persisted index has no inflater state, so the member
+            # is inflated, but not parsed, up to the row
+            with self.book.open_member(self.sheet_file) as content:
+                content.seek(offset)
+                chunks = iter(partial(content.read, CHUNK_SIZE), b"")
+                stream = IterStream(chain([header], chunks))
+                yield from iter_sheet_rows(stream)
+
+    def row_index(self):
+        """
+        the row index of this sheet, loaded or built on first use
+
+        it is persisted next to the workbook or in row_index_dir. None
+        is returned for members that cannot be inflated here.
+        """
+        if self._row_index is None:
+            info = self.book.zip_file.getinfo(self.sheet_file)
+            if not can_inflate(info):
+                return None
+            path = self.book.row_index_path(self.sheet_file, info)
+            row_index = RowIndex.load(path, info) if path else None
+            if row_index is None:
+                row_index = RowIndex.build(self.book.zip_file.fp, info)
+                if path:
+                    try:
+                        row_index.save(path)
+                    except OSError:
+                        # e.g. a read only folder, keep it in memory
+                        pass
+            self._row_index = row_index
+        return self._row_index
+
+    def decode(self, row, columns=None, start_column=0, column_limit=-1):
+        return decode_row(row, self.book, start_column, column_limit, columns)
+
+    def resolve_columns(self, columns):
+        """
+        map column letters, 0-based indices or header names to the
+        {column number: position} form that decode_row() projects on
+
+        a string found in the first row is a header name, otherwise it
+        is taken as a column letter. Negative indices and columns that
+        are selected twice are refused.
+        """
+        header = None
+        resolved = {}
+        for position, column in enumerate(columns):
+            if isinstance(column, int):
+                if column < 0:
+                    raise ValueError("Negative column index: %d" % column)
+                number = column + 1
+            else:
+                if header is None:
+                    header = self.header_columns()
+                number = header.get(column)
+                if number is None:
+                    if not COLUMN_LETTERS_MATCHER.match(column):
+                        raise ValueError("Unknown column: %s" % column)
+                    number = column_to_number(column)
+            if number in resolved:
+                raise ValueError("Column selected twice: %s" % column)
+            resolved[number] = position
+        return resolved
+
+    def header_columns(self):
+        """the column number of every value in the first row"""
+        for row in self.rows():
+            return {
+                decode_cell(element, self.book): number
+                for number, element in iter_cells(row)
+            }
+        return {}
+
+
+class XLSXTableFuture(object):
+    """a table being parsed in a worker process, see XLSXBookSet.make_pool"""
+
+    def __init__(self, name, future):
+        self.name = name
+        self.future = future
 
     def raw(self):
-        rows = XLSX_ROW_MATCH.findall(self.content)
-        for row in rows:
-            yield parse_row(row, self.book)
+        yield from self.future.result()
 
 
 class XLSXBookSet(object):
-    def __init__(self, file_alike, **keywords):
-        if hasattr(file_alike, "read"):
-            file_alike = io.BytesIO(file_alike.read())
+    def __init__(
+        self,
+        file_alike,
+        shared_strings=SHARED_STRINGS_IN_MEMORY,
+        spool_threshold=SPOOL_THRESHOLD,
+        use_mmap=False,
+        row_index=False,
+        row_index_dir=None,
+        auto_detect_int=True,
+        auto_detect_float=True,
+        cache=None,
+        sidecar=False,
+        sidecar_dir=None,
+        **keywords
+    ):
+        if shared_strings == SHARED_STRINGS_IN_MEMORY:
+            self.__shared_strings_class = SharedStrings
+        elif shared_strings == SHARED_STRINGS_ON_DISK:
+            self.__shared_strings_class = SpilledSharedStrings
+        elif shared_strings == SHARED_STRINGS_INDEXED:
+            self.__shared_strings_class = IndexedSharedStrings
+        else:
+            raise ValueError(
+                "Unknown shared strings storage: %s" % shared_strings
+            )
+        self.file_name = None
+        if isinstance(file_alike, (str, os.PathLike)):
+            self.file_name = file_alike
+        self.use_mmap = use_mmap
+        self.use_row_index = row_index
+        self.row_index_dir = row_index_dir
+        self.use_sidecar = sidecar
+        self.sidecar_dir = sidecar_dir
+        self.parse_number = number_parser(auto_detect_int, auto_detect_float)
+        self.spooled_file = None
+        self.mapped_file = None
+        if hasattr(file_alike, "read") and not is_seekable(file_alike):
+            self.spooled_file = spool(file_alike, spool_threshold)
+            file_alike = self.spooled_file
+        self.cache = cache
+        self.cache_key = None
+        if cache is not None:
+            self.cache_key = cache.key_for(file_alike)
+        if use_mmap and self.file_name:
+            self.mapped_file = MappedFile.from_path(file_alike)
+            file_alike = self.mapped_file
         self.zip_file = zipfile.ZipFile(file_alike)
-        self.styles, self.xfs_styles = self.__extract_styles()
-        self.properties = self.__extract_book_properties()
-        self.shared_strings = list(self.__extract_shared_strings())
+
+    # styles, workbook properties and shared strings are each parsed on
+    # first use, so that e.g. a numeric sheet never reads shared strings
+
+    @cached_property
+    def styles(self):
+        return self.style_tables[0]
+
+    @cached_property
+    def xfs_styles(self):
+        return self.style_tables[1]
+
+    @cached_property
+    def cell_types(self):
+        return self.style_tables[2]
+
+    @cached_property
+    def style_tables(self):
+        """the numFmts and cellXfs of styles.xml, and their cell types"""
+        return self.load_part(STYLE_FILENAME, self.__extract_styles)
+
+    @cached_property
+    def properties(self):
+        return self.load_part(WORK_BOOK, self.__extract_book_properties)
+
+    @cached_property
+    def date1904(self):
+        """the date system, resolved once rather than per date cell"""
+        return bool(self.properties.get("date1904"))
+
+    @cached_property
+    def shared_strings(self):
+        return self.load_part(SHARED_STRING, self.__extract_shared_strings)
+
+    def load_parts(self):
+        """parse the styles, properties and shared strings now"""
+        for name in LAZY_PARTS:
+            getattr(self, name)
+        if isinstance(self.shared_strings, IncrementalSharedStrings):
+            self.shared_strings.load()
+
+    def load_part(self, name, extract):
+        """
+        parse a part of the workbook, or take it from the cache
+
+        a cached part is complete, so shared strings are parsed in full
+        when there is a cache.
+        """
+        if self.cache is None:
+            return extract()
+        key = member_key(self.cache_key, name)
+        part = self.cache.get(key)
+        if part is None:
+            part = extract()
+            self.cache.put(key, part)
+        return part
 
     def __extract_shared_strings(self):
         try:
-            shared_string_content = self.zip_file.open(SHARED_STRING).read()
-            return parse_shared_strings(shared_string_content)
+            self.zip_file.getinfo(SHARED_STRING)
         except KeyError:
-            return []
+            return SharedStrings()
+        if self.__shared_strings_class is SharedStrings:
+            return IncrementalSharedStrings(self.__iter_shared_strings())
+        if self.__shared_strings_class is IndexedSharedStrings:
+            location = None
+            if self.file_name:
+                info = self.zip_file.getinfo(SHARED_STRING)
+                location = (self.file_name, SHARED_STRING, info.CRC)
+            with self.open_member(SHARED_STRING) as shared_string_content:
+                return IndexedSharedStrings.from_stream(
+                    shared_string_content, location=location
+                )
+        return self.__shared_strings_class(self.__iter_shared_strings())
+
+    def __iter_shared_strings(self):
+        with self.open_member(SHARED_STRING) as shared_string_content:
+            yield from parse_shared_strings(shared_string_content)
 
     def __extract_styles(self):
-        style_content = self.zip_file.open(STYLE_FILENAME).read()
-        return parse_styles(style_content), parse_xfs_styles(style_content)
+        with self.open_member(STYLE_FILENAME) as style_file:
+            style_content = style_file.read()
+        styles = parse_styles(style_content)
+        xfs_styles = parse_xfs_styles(style_content)
+        return styles, xfs_styles, parse_cell_types(styles, xfs_styles)
 
     def __extract_book_properties(self):
-        book_content = self.zip_file.open(WORK_BOOK).read()
+        with self.open_member(WORK_BOOK) as book_file:
+            book_content = book_file.read()
         return parse_book_properties(book_content)
 
+    def open_member(self, name):
+        """
+        open a zip member for reading
+
+        on a memory mapped workbook, STORED members are served straight
+        from the mapping without passing through zipfile.
+        """
+        info = self.zip_file.getinfo(name)
+        stored = (
+            info.compress_type == zipfile.ZIP_STORED
+            and not info.flag_bits & 0x1
+        )
+        if self.mapped_file and stored:
+            return self.mapped_file.member(info)
+        return self.zip_file.open(name)
+
+    def row_index_path(self, sheet_file, info):
+        """where the row index of a sheet is persisted"""
+        return self.member_file_path(
+            sheet_file, info, self.row_index_dir, "rowindex"
+        )
+
+    def sidecar_path(self, sheet_file, info):
+        """
+        where the decoded rows of a sheet are persisted
+
+        in sidecar_dir, the file is named after the workbook's path, or
+        for streams after the crc32 of its parts, so that two workbooks
+        sharing the same sheet xml never share a sidecar.
+        """
+        if self.sidecar_dir:
+            identity = "%s:%s:%s" % (
+                os.path.abspath(self.file_name) if self.file_name else "",
+                sheet_file,
+                self.sidecar_signature(info),
+            )
+            digest = hashlib.sha256(identity.encode("utf-8")).hexdigest()
+            return os.path.join(self.sidecar_dir, digest + ".sidecar")
+        return self.member_file_path(sheet_file, info, None, "sidecar")
+
+    def member_file_path(self, sheet_file, info, directory, extension):
+        """
+        where a file derived from a sheet is persisted
+
+        files in directory are keyed by the member content, those next
+        to the workbook by the sheet file name.
+        """
+        if directory:
+            file_name = "%08x-%d-%d.%s" % (
+                info.CRC,
+                info.compress_size,
+                info.file_size,
+                extension,
+            )
+            return os.path.join(directory, file_name)
+        if self.file_name:
+            return "%s.%s.%s" % (
+                os.fspath(self.file_name),
+                os.path.basename(sheet_file),
+                extension,
+            )
+        return None
+
+    def sidecar_signature(self, info):
+        """
+        the crc32 of a sheet member and of the parts its decoded values
+        depend on: shared strings, styles and the workbook's date system
+        """
+        signature = [info.CRC]
+        for name in [SHARED_STRING, STYLE_FILENAME, WORK_BOOK]:
+            try:
+                signature.append(self.zip_file.getinfo(name).CRC)
+            except KeyError:
+                signature.append(0)
+        return signature
+
     def close(self):
+        # shared strings that were never loaded are left alone, and so
+        # are those of a cache, which other books may be reading
+        shared_strings = self.__dict__.get("shared_strings")
+        if shared_strings is not None and self.cache is None:
+            shared_strings.close()
         if self.zip_file:
             self.zip_file.close()
+        if self.spooled_file:
+            self.spooled_file.close()
+        if self.mapped_file:
+            self.mapped_file.close()
 
     def make_tables(self):
         sheet_files = find_sheets(self.zip_file.namelist())
         for sheet_file in sorted(sheet_files):
-            content = self.zip_file.open(sheet_file).read()
             sheet_index = get_sheet_index(sheet_file)
             sheet_name = self.properties["sheets"][sheet_index]
-            yield XLSXTable(sheet_name, content, self)
+            yield XLSXTable(sheet_name, sheet_file, self)
+
+    def make_pool(self, workers):
+        """
+        a process pool whose workers each receive this book once
+
+        the workers reopen the zip file by name, so it is only
+        available to workbooks that were opened from a path.
+        """
+        if not self.file_name:
+            raise ValueError("Only workbooks on disk can be read in a pool")
+        # the parts are parsed once, here, and reach every worker with
+        # the book, which is pickled here, as forked workers would
+        # otherwise share the file offset of this book's zip file
+        self.load_parts()
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_set_worker_book,
+            initargs=(pickle_for_workers(self),),
+        )
+
+    def submit(self, pool, table, columns=None):
+        future = pool.submit(_read_worker_table, table.sheet_file, columns)
+        return XLSXTableFuture(table.name, future)
+
+    def caches_sheets(self):
+        return self.cache is not None and self.cache.cache_sheets
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for unpicklable in ["zip_file", "spooled_file", "mapped_file"]:
+            state[unpicklable] = None
+        # pool workers do not share the cache of the parent process
+        state["cache"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        file_alike = self.file_name
+        if self.use_mmap:
+            self.mapped_file = file_alike = MappedFile.from_path(file_alike)
+        self.zip_file = zipfile.ZipFile(file_alike)
+
+
+class XLSXChunkedTable(object):
+    """
+    a table whose rows are decoded by pool workers, chunk by chunk
+
+    the sheet is still inflated and split here, and at most backlog
+    chunks are in flight so that memory stays bounded.
+    """
+
+    def __init__(self, table, pool, chunk_size, backlog, columns=None):
+        self.name = table.name
+        self.columns = columns
+        self.table = table
+        self.pool = pool
+        self.chunk_size = chunk_size
+        self.backlog = backlog
+
+    def raw(self):
+        pending = deque()
+        with self.table.book.open_member(self.table.sheet_file) as content:
+            for document in split_sheet(content, self.chunk_size):
+                pending.append(
+                    self.pool.submit(
+                        _read_worker_chunk, document, self.columns
+                    )
+                )
+                if len(pending) > self.backlog:
+                    yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def pickle_for_workers(book):
+    """
+    pickle a book for pool workers, which open its file again anyway
+
+    so indexed shared strings are pickled as their index and location,
+    without their xml, see IndexedSharedStrings.reduce_to_location().
+    """
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = copyreg.dispatch_table.copy()
+    pickler.dispatch_table[IndexedSharedStrings] = (
+        IndexedSharedStrings.reduce_to_location
+    )
+    pickler.dump(book)
+    return buffer.getvalue()
+
+
+# the book a pool worker reads from, set once by the pool initializer
+_worker_book = None
+
+
+def _set_worker_book(pickled_book):
+    global _worker_book
+    _worker_book = pickle.loads(pickled_book)
+
+
+def _read_worker_table(sheet_file, columns=None):
+    table = XLSXTable(sheet_file, sheet_file, _worker_book)
+    return list(table.raw(columns=columns))
+
+
+def _read_worker_chunk(document, columns=None):
+    return list(parse_sheet(io.BytesIO(document), _worker_book, columns))
+
+
+def iter_blocks(iterable, size):
+    """yield lists of at most size items"""
+    iterator = iter(iterable)
+    while True:
+        block = list(islice(iterator, size))
+        if not block:
+            return
+        yield block
+
+
+def is_seekable(stream):
+    seekable = getattr(stream, "seekable", None)
+    return bool(seekable and seekable())
+
+
+def spool(stream, threshold=SPOOL_THRESHOLD):
+    """
+    copy a non-seekable stream into a temporary file for zipfile
+
+    the copy stays in memory until it grows beyond the threshold.
+    """
+    spooled_file = tempfile.SpooledTemporaryFile(max_size=threshold)
+    shutil.copyfileobj(stream, spooled_file)
+    spooled_file.seek(0)
+    return spooled_file
+
+
+class MappedFile(io.RawIOBase):
+    """
+    a read only, seekable file object over a memory mapped region
+
+    reads copy only the requested bytes out of the mapping.
+    """
+
+    def __init__(self, view, mapping=None):
+        self.view = view
+        self.mapping = mapping
+        self.position = 0
+
+    @classmethod
+    def from_path(cls, file_name):
+        with open(file_name, "rb") as mapped_file:
+            mapping = mmap.mmap(
+                mapped_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        return cls(memoryview(mapping), mapping)
+
+    def member(self, info):
+        """a STORED zip member as another MappedFile, without copying"""
+        start = member_data_offset(self, info)
+        end = start + info.compress_size
+        return MappedFile(self.view[start:end])
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        if offset < 0:
+            raise ValueError("Negative seek position %d" % offset)
+        self.position = offset
+        return self.position
+
+    def tell(self):
+        return self.position
+
+    def read(self, size=-1):
+        start = self.position
+        if size is None or size < 0:
+            end = len(self.view)
+        else:
+            end = start + size
+        data = self.view[start:end].tobytes()
+        self.position += len(data)
+        return data
+
+    def readinto(self, buffer):
+        start = self.position
+        end = start + len(buffer)
+        data = self.view[start:end]
+        size = len(data)
+        buffer[:size] = data
+        self.position += size
+        return size
+
+    def close(self):
+        if self.closed:
+            return
+        self.view.release()
+        if self.mapping:
+            try:
+                self.mapping.close()
+            except BufferError:
+                # a member is still being read, gc will unmap it later
+                pass
+        super().close()
+
+
+def member_data_offset(fp, info):
+    """where the data of a zip member starts, past its local header"""
+    fp.seek(info.header_offset)
+    header = fp.read(LOCAL_FILE_HEADER.size)
+    signature, name_size, extra_size = LOCAL_FILE_HEADER.unpack(header)
+    if signature != LOCAL_FILE_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile("Bad local file header: %s" % info)
+    return info.header_offset + LOCAL_FILE_HEADER.size + name_size + extra_size
+
+
+def can_inflate(info):
+    return (
+        info.compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+        and not info.flag_bits & 0x1
+    )
+
+
+def inflate_member(fp, info, position=None, decompressor=None):
+    """
+    yield the decompressed chunks of a STORED or DEFLATED zip member
+
+    each chunk comes with the position in fp after it and the inflater
+    that produced it, which is what it takes to resume later on.
+    """
+    start = member_data_offset(fp, info)
+    end = start + info.compress_size
+    if position is None:
+        position = start
+        if info.compress_type == zipfile.ZIP_DEFLATED:
+            decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+    while position < end:
+        fp.seek(position)
+        data = fp.read(min(CHUNK_SIZE, end - position))
+        if not data:
+            raise zipfile.BadZipFile("Truncated zip member: %s" % info)
+        position += len(data)
+        if decompressor:
+            data = decompressor.decompress(data)
+        yield position, decompressor, data
+    if decompressor:
+        yield position, decompressor, decompressor.flush()
+
+
+class IterStream(object):
+    """a minimal readable file object over an iterable of byte strings"""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.chunk = b""
+        self.position = 0
+
+    def read(self, size=-1):
+        parts = []
+        while size:
+            if self.position >= len(self.chunk):
+                self.chunk = next(self.chunks, None)
+                self.position = 0
+                if self.chunk is None:
+                    self.chunk = b""
+                    break
+                continue
+            start = self.position
+            end = len(self.chunk) if size < 0 else start + size
+            part = self.chunk[start:end]
+            self.position += len(part)
+            parts.append(part)
+            if size > 0:
+                size -= len(part)
+        return b"".join(parts)
+
+
+class RowIndex(object):
+    """
+    a sparse map from row ordinals to where they start in a sheet member
+
+    offsets are into the decompressed sheet xml. An index built in this
+    process also keeps zlib checkpoints, so reading resumes right at an
+    indexed row. A checkpoint is the inflater before the chunk the row
+    starts in and the row's offset in that chunk, which is inflated
+    again on resume, so no inflated xml is kept. A persisted index only
+    has the offsets, which still saves parsing everything before them.
+    """
+
+    def __init__(self, crc, file_size, header=b""):
+        self.crc = crc
+        self.file_size = file_size
+        # the sheet xml up to <sheetData>, to put in front of resumed rows
+        self.header = header
+        self.ordinals = array("Q")
+        self.offsets = array("Q")
+        self.checkpoints = {}
+
+    def add(self, ordinal, offset, checkpoint=None):
+        self.ordinals.append(ordinal)
+        self.offsets.append(offset)
+        if checkpoint:
+            self.checkpoints[ordinal] = checkpoint
+
+    def find(self, ordinal):
+        """the nearest indexed row at or before ordinal, if any"""
+        if not self.header:
+            return None
+        position = bisect.bisect_right(self.ordinals, ordinal) - 1
+        if position < 0:
+            return None
+        indexed = self.ordinals[position]
+        return (
+            indexed,
+            self.offsets[position],
+            self.checkpoints.get(indexed),
+        )
+
+    @classmethod
+    def build(cls, fp, info, interval=None):
+        """scan a sheet member once, counting rows without parsing them"""
+        if interval is None:
+            interval = ROW_INDEX_INTERVAL
+        row_index = cls(info.CRC, info.file_size)
+        buffer = b""
+        buffer_offset = 0
+        ordinal = 0
+        next_offset = interval
+        # the inflater before the current chunk, and where that starts,
+        # the first chunk is inflated from the start of the member
+        resume_from = (None, None)
+        chunk_offset = 0
+        for position, decompressor, data in inflate_member(fp, info):
+            chunk_state, resume_from = resume_from, None
+            chunk_start = chunk_offset
+            chunk_offset += len(data)
+            buffer += data
+            if not row_index.header:
+                sheet_data = SHEET_DATA_MATCHER.search(buffer)
+                if sheet_data is None:
+                    continue
+                if sheet_data.group(2) or b":" in sheet_data.group(1):
+                    # no rows, or prefixed ones, nothing to index
+                    break
+                buffer_offset = sheet_data.end()
+                row_index.header = buffer[:buffer_offset]
+                buffer = buffer[buffer_offset:]
+            # "<row" at the very end may yet turn out to be "<rowBreaks"
+            scanned = max(len(buffer) - 4, 0)
+            for match in ROW_START_MATCHER.finditer(buffer):
+                row_start = match.start()
+                if row_start >= scanned:
+                    break
+                offset = buffer_offset + row_start
+                indexed = offset >= next_offset
+                if indexed and decompressor:
+                    # only a row of a chunk whose inflater was kept can
+                    # be resumed, otherwise a later row is indexed
+                    indexed = chunk_state is not None and (
+                        offset >= chunk_start
+                    )
+                if indexed:
+                    checkpoint = None
+                    if decompressor:
+                        checkpoint = chunk_state + (offset - chunk_start,)
+                    row_index.add(ordinal, offset, checkpoint)
+                    next_offset = offset + interval
+                ordinal += 1
+            buffer_offset += scanned
+            buffer = buffer[scanned:]
+            # the inflater is copied only when the next row to index may
+            # be in the next chunk, taken to inflate to as much as this
+            near = chunk_offset + len(data) >= next_offset
+            if decompressor and near and not decompressor.eof:
+                resume_from = (position, decompressor.copy())
+        return row_index
+
+    def save(self, path):
+        with atomic_write(path) as index_file:
+            index_file.write(
+                ROW_INDEX_HEADER.pack(
+                    ROW_INDEX_MAGIC,
+                    self.crc,
+                    self.file_size,
+                    len(self.header),
+                    len(self.ordinals),
+                )
+            )
+            index_file.write(self.header)
+            self.ordinals.tofile(index_file)
+            self.offsets.tofile(index_file)
+
+    @classmethod
+    def load(cls, path, info):
+        """a persisted index, if there is a valid one for this member"""
+        try:
+            with open(path, "rb") as index_file:
+                fields = index_file.read(ROW_INDEX_HEADER.size)
+                if len(fields) != ROW_INDEX_HEADER.size:
+                    return None
+                magic, crc, file_size, header_size, count = (
+                    ROW_INDEX_HEADER.unpack(fields)
+                )
+                stale = (crc, file_size) != (info.CRC, info.file_size)
+                if magic != ROW_INDEX_MAGIC or stale:
+                    return None
+                row_index = cls(crc, file_size, index_file.read(header_size))
+                row_index.ordinals.fromfile(index_file, count)
+                row_index.offsets.fromfile(index_file, count)
+                return row_index
+        except (OSError, EOFError):
+            return None
+
+
+def iter_rows(stream, chunk_size=CHUNK_SIZE, buffer=b""):
+    """
+    yield each <row> of a sheet stream without reading it all
+
+    only the unfinished tail of the last chunk is kept between reads,
+    so memory is bounded by the chunk size plus the longest row.
+    buffer holds bytes that were already read off the stream. Rows may
+    be self-closing and may carry a namespace prefix, as in <x:row>.
+    """
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += chunk
+        consumed = 0
+        for match in SHEET_ROW_MATCHER.finditer(buffer):
+            yield match.group(0)
+            consumed = match.end()
+        if not chunk:
+            break
+        match = SHEET_ROW_START_MATCHER.search(buffer, consumed)
+        if match is None:
+            # keep the last tag, it may be a "<row" split across chunks
+            pending = max(consumed, buffer.rfind(b"<"))
+        else:
+            pending = match.start()
+        buffer = buffer[pending:]
+
+
+def split_sheet(stream, chunk_size=SHEET_CHUNK_SIZE):
+    """
+    cut a sheet into standalone xml documents of whole rows
+
+    every document repeats the sheet header, namespaces included, in
+    front of at least chunk_size bytes of rows, so parse_sheet can
+    decode it on its own. Rows never depend on each other.
+    """
+    head = b""
+    sheet_data = None
+    while sheet_data is None:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        head += chunk
+        sheet_data = SHEET_DATA_MATCHER.search(head)
+    if sheet_data.group(2):
+        # <sheetData/>, no rows at all
+        return
+    rows_start = sheet_data.end()
+    header = head[:rows_start]
+    footer = b"</%s></%s>" % (
+        sheet_data.group(1),
+        ROOT_TAG_MATCHER.search(header).group(1),
+    )
+    rows = []
+    size = 0
+    for row in iter_rows(stream, buffer=head[rows_start:]):
+        rows.append(row)
+        size += len(row)
+        if size >= chunk_size:
+            yield header + b"".join(rows) + footer
+            rows = []
+            size = 0
+    if rows:
+        yield header + b"".join(rows) + footer
+
+
+class SharedStrings(object):
+    """
+    shared strings packed into one utf-8 buffer plus an offsets array
+
+    a string is only decoded when it is looked up, and the most recent
+    lookups are kept in a small lru cache.
+    """
+
+    def __init__(self, strings=(), cache_size=SHARED_STRINGS_CACHE_SIZE):
+        self.buffer = bytearray()
+        self.offsets = array("Q", [0])
+        for text in strings:
+            self.append(text)
+        self.use_cache(cache_size)
+
+    def use_cache(self, cache_size):
+        self.cache_size = cache_size
+        if cache_size:
+            self._lookup = lru_cache(maxsize=cache_size)(self._decode)
+        else:
+            self._lookup = self._decode
+
+    def append(self, text):
+        self.buffer += text.encode("utf-8")
+        self.offsets.append(len(self.buffer))
+
+    def _decode(self, index):
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return str(self.buffer[start:end], "utf-8")
+
+    def __getitem__(self, index):
+        return self._lookup(index)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self):
+        pass
+
+    def __getstate__(self):
+        return {
+            "buffer": self.buffer,
+            "offsets": self.offsets,
+            "cache_size": self.cache_size,
+        }
+
+    def __setstate__(self, state):
+        self.buffer = state["buffer"]
+        self.offsets = state["offsets"]
+        self.use_cache(state["cache_size"])
+
+
+class IncrementalSharedStrings(SharedStrings):
+    """
+    shared strings that are parsed only as far as they are looked up
+
+    the rest of the table stays in the zip member until a lookup past
+    the parsed strings, len() or a pickle needs it.
+    """
+
+    def __init__(self, strings, cache_size=SHARED_STRINGS_CACHE_SIZE):
+        super().__init__((), cache_size)
+        self.pending = iter(strings)
+
+    def load(self, count=None):
+        """parse strings until count of them are known, or all of them"""
+        while self.pending is not None:
+            if count is not None and len(self.offsets) > count:
+                return
+            text = next(self.pending, None)
+            if text is None:
+                self.close()
+            else:
+                self.append(text)
+
+    def _decode(self, index):
+        if len(self.offsets) <= index + 1:
+            self.load(index + 1)
+        return super()._decode(index)
+
+    def __len__(self):
+        self.load()
+        return super().__len__()
+
+    def close(self):
+        if self.pending is not None:
+            self.pending.close()
+            self.pending = None
+
+    def __reduce__(self):
+        self.load()
+        return (SharedStrings, (), SharedStrings.__getstate__(self))
+
+
+class SpilledSharedStrings(SharedStrings):
+    """
+    the same table as SharedStrings, spilled to temporary files
+
+    both the utf-8 buffer and the offsets are memory mapped, so lookups
+    are zero-copy slices and resident memory stays flat however many
+    strings the workbook has. The page cache keeps the hot ones.
+    """
+
+    def __init__(self, strings=(), cache_size=SHARED_STRINGS_CACHE_SIZE):
+        self._files = [tempfile.TemporaryFile(), tempfile.TemporaryFile()]
+        self._maps = []
+        buffer_file, offsets_file = self._files
+        offsets = array("Q", [0])
+        end = 0
+        for text in strings:
+            data = text.encode("utf-8")
+            buffer_file.write(data)
+            end += len(data)
+            offsets.append(end)
+            if len(offsets) >= SPILL_BATCH_SIZE:
+                offsets.tofile(offsets_file)
+                del offsets[:]
+        offsets.tofile(offsets_file)
+        self.buffer = self._map(buffer_file)
+        self.offsets = self._map(offsets_file).cast("Q")
+        self.use_cache(cache_size)
+
+    def _map(self, spill_file):
+        spill_file.flush()
+        if spill_file.tell() == 0:
+            # mmap refuses empty files, which only happens to the buffer
+            return memoryview(b"")
+        mapped = mmap.mmap(spill_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return memoryview(mapped)
+
+    def append(self, text):
+        raise NotImplementedError("Spilled shared strings are read only")
+
+    def __reduce__(self):
+        # temporary files cannot follow a pickle, so copies, e.g. the
+        # ones sent to pool workers, are ordinary in-memory tables
+        offsets = array("Q")
+        offsets.frombytes(self.offsets.cast("B"))
+        state = {
+            "buffer": bytearray(self.buffer),
+            "offsets": offsets,
+            "cache_size": self.cache_size,
+        }
+        return (SharedStrings, (), state)
+
+    def close(self):
+        self._lookup = self._decode
+        self.buffer.release()
+        self.offsets.release()
+        for mapped in self._maps:
+            mapped.close()
+        for spill_file in self._files:
+            spill_file.close()
+
+
+def read_metadata(file_alike):
+    """
+    the name, visibility, dimension and sizes of every sheet
+
+    only workbook.xml and the head of each sheet, up to <sheetData>,
+    are read. Styles, shared strings and rows are never touched, so it
+    takes as long on a huge workbook as on a small one.
+
+    the dimension is the range the writer recorded, e.g. "A1:D300",
+    and rows and columns are its size. Both are None when the sheet
+    has no dimension.
+    """
+    spooled_file = None
+    if hasattr(file_alike, "read") and not is_seekable(file_alike):
+        spooled_file = file_alike = spool(file_alike)
+    try:
+        with zipfile.ZipFile(file_alike) as zip_file:
+            with zip_file.open(WORK_BOOK) as book_file:
+                properties = parse_book_properties(book_file.read())
+            sheet_files = find_sheets(zip_file.namelist())
+            metadata = OrderedDict()
+            for sheet_file in sorted(sheet_files, key=get_sheet_index):
+                sheet_index = get_sheet_index(sheet_file)
+                info = zip_file.getinfo(sheet_file)
+                with zip_file.open(info) as sheet:
+                    dimension = read_dimension(sheet)
+                rows, columns = dimension_size(dimension)
+                metadata[properties["sheets"][sheet_index]] = {
+                    "state": properties["sheet_states"][sheet_index],
+                    "dimension": dimension,
+                    "rows": rows,
+                    "columns": columns,
+                    "file_size": info.file_size,
+                    "compress_size": info.compress_size,
+                }
+            return metadata
+    finally:
+        if spooled_file:
+            spooled_file.close()
+
+
+def read_dimension(stream):
+    """the dimension ref of a sheet, reading no further than <sheetData>"""
+    head = b""
+    while True:
+        chunk = stream.read(HEAD_CHUNK_SIZE)
+        head += chunk
+        match = DIMENSION_MATCHER.search(head)
+        if match:
+            return match.group(1).decode("utf-8")
+        if not chunk or SHEET_DATA_MATCHER.search(head):
+            return None
+
+
+def dimension_size(dimension):
+    """the rows and columns spanned by a ref such as A1:D300"""
+    if not dimension:
+        return None, None
+    cells = [
+        CELL_REFERENCE_MATCHER.match(cell) for cell in dimension.split(":")
+    ]
+    if not all(cells):
+        return None, None
+    first, last = cells[0], cells[-1]
+    rows = int(last.group(2)) - int(first.group(2)) + 1
+    columns = (
+        column_to_number(last.group(1)) - column_to_number(first.group(1)) + 1
+    )
+    return rows, columns
+
+
+class IndexedSharedStrings(SharedStrings):
+    """
+    shared strings decoded one at a time, straight from the xml
+
+    one regular expression scan records where every <si> starts, and a
+    string is only parsed when it is looked up, then kept in the lru
+    cache. A sheet that uses a few of the workbook's strings never pays
+    for the others.
+
+    a pickle carries the xml along with the index, so that a copy, e.g.
+    in a WorkbookCache directory, needs nothing else. The copies sent to
+    pool workers, see pickle_for_workers(), carry the index and location
+    alone, that is the workbook path, member name and crc32, and the
+    member is inflated again in the worker.
+    """
+
+    def __init__(
+        self,
+        content,
+        cache_size=SHARED_STRINGS_CACHE_SIZE,
+        location=None,
+        index=None,
+    ):
+        self.content = content
+        self.location = location
+        self._files = []
+        if index is None:
+            index = index_shared_strings(content)
+        self.starts, self.end, self.header, self.footer = index
+        self.use_cache(cache_size)
+
+    @classmethod
+    def from_stream(
+        cls,
+        stream,
+        cache_size=SHARED_STRINGS_CACHE_SIZE,
+        location=None,
+        index=None,
+    ):
+        """index the xml of a stream, inflated into a mapped temporary file"""
+        spill_file = tempfile.TemporaryFile()
+        shutil.copyfileobj(stream, spill_file, CHUNK_SIZE)
+        spill_file.flush()
+        if spill_file.tell() == 0:
+            spill_file.close()
+            return cls(b"", cache_size, location)
+        mapping = mmap.mmap(spill_file.fileno(), 0, access=mmap.ACCESS_READ)
+        strings = cls(mapping, cache_size, location, index)
+        strings._files = [mapping, spill_file]
+        return strings
+
+    def append(self, text):
+        raise NotImplementedError("Indexed shared strings are read only")
+
+    def _decode(self, index):
+        start = self.starts[index]
+        if index + 1 < len(self.starts):
+            end = self.starts[index + 1]
+        else:
+            end = self.end
+        document = self.header + self.content[start:end] + self.footer
+        return shared_string_text(etree.fromstring(document)[0])
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __reduce__(self):
+        # the xml travels instead of the mapping
+        index = (self.starts, self.end, self.header, self.footer)
+        return (
+            self.__class__,
+            (bytes(self.content), self.cache_size, None, index),
+        )
+
+    def reduce_to_location(self):
+        """pickle the index and the location of the xml, if known"""
+        if self.location is None:
+            return self.__reduce__()
+        index = (self.starts, self.end, self.header, self.footer)
+        return (
+            open_indexed_shared_strings,
+            (self.location, index, self.cache_size),
+        )
+
+    def close(self):
+        self._lookup = self._decode
+        for opened in self._files:
+            opened.close()
+        self._files = []
+
+
+def index_shared_strings(content):
+    """the <si> offsets, the end of the last one and the root tags"""
+    starts = array("Q")
+    root = SHARED_STRINGS_ROOT_MATCHER.search(content)
+    if root is None:
+        return starts, 0, b"", b""
+    starts.extend(
+        match.start()
+        for match in SHARED_STRING_MATCHER.finditer(content, root.end())
+    )
+    # every string is parsed inside the root tag, for namespaces
+    footer = b"</%s>" % root.group(1)
+    return starts, content.rfind(b"</"), root.group(0), footer
+
+
+def open_indexed_shared_strings(location, index, cache_size):
+    """
+    indexed shared strings inflated again from their workbook
+
+    the index is only trusted while the member has the same crc32.
+    """
+    file_name, member, crc = location
+    with zipfile.ZipFile(file_name) as zip_file:
+        info = zip_file.getinfo(member)
+        if info.CRC != crc:
+            index = None
+        with zip_file.open(info) as stream:
+            return IndexedSharedStrings.from_stream(
+                stream, cache_size, (file_name, member, info.CRC), index
+            )
 
 
 def find_sheets(file_list):
@@ -168,17 +1508,6 @@ def get_sheet_index(file_name):
         raise Exception("Invalid sheet file name")
 
 
-class Cell(object):
-    def __init__(self):
-        self.column_type = ""
-        self.style_string = ""
-        self.value = ""
-        self.type = ""
-
-    def __repr__(self):
-        return str(self.value)
-
-
 @cache
 def column_to_number(column):
     column = re.sub(r"[^A-Z]", "", column.upper())
@@ -191,106 +1520,236 @@ def column_to_number(column):
     return result
 
 
+def parse_sheet(stream, book, columns=None):
+    """walk the sheet xml once and yield every row as a list of values"""
+    for row in iter_sheet_rows(stream):
+        yield decode_row(row, book, columns=columns)
+
+
+def iter_sheet_rows(stream):
+    """
+    yield every <row> element of the sheet xml, in one pass
+
+    rows are dropped from the tree as soon as the next one is asked for,
+    so the parser never holds more than the current row. They are not
+    cleared, a row that the caller keeps is still whole.
+    """
+    for action, row in etree.iterparse(stream, events=("end",), tag=ROW_TAG):
+        yield row
+        row.getparent().remove(row)
+
+
 def parse_row(row_xml_string, book):
     if b"x14ac" in row_xml_string:
         row_xml_string = row_xml_string.replace(
             b"<row", (b"<row " + X14AC_NAMESPACE)
         )
-    partial = io.BytesIO(row_xml_string)
-    cells = []
-    cell = Cell()
+    return decode_row(etree.fromstring(row_xml_string), book)
+
+
+def decode_row(row, book, start_column=0, column_limit=-1, columns=None):
+    """
+    decode a <row> element straight into a list of cell values
+
+    gaps between referenced columns are padded with empty strings. Only
+    the cells from start_column, at most column_limit of them, are
+    decoded and returned. With columns, see project_row(), only the
+    selected cells are.
+    """
+    if columns:
+        return project_row(row, book, columns)
+    values = []
 
+    end_column = None
+    if column_limit > -1:
+        end_column = start_column + column_limit
+    position = 0
     last_column_number = None
-    for action, element in etree.iterparse(partial):
-        if element.tag in ["v", "t"]:
-            cell.value = element.text
-        elif element.tag in ["c"]:
-            ref = element.attrib.get("r")
-            if ref:
-                column_number = column_to_number(ref)
-                if last_column_number is not None:
-                    padding = column_number - last_column_number - 1
-                    if padding > 0:
-                        cells += [Cell() for _ in range(padding)]
-                last_column_number = column_number
-
-            local_type = element.attrib.get("t")
-            cell.column_type = local_type
-            style_int = element.attrib.get("s")
-            if style_int:
-                xfs_style_int = book.xfs_styles[int(style_int)]
-                cell.style_string = book.styles.get(str(xfs_style_int))
-            parse_cell(cell, book)
-            cells.append(cell)
-            cell = Cell()
-    return [c.value for c in cells]
-
-
-def parse_cell(cell, book):
-    cell.type = parse_cell_type(cell)
-    parse_cell_value(cell, book)
-
-
-def parse_cell_type(cell):
+    for element in row.iterchildren(CELL_TAG):
+        ref = element.get("r")
+        if ref:
+            # drop the row digits so that the column cache stays small
+            column_number = column_to_number(ref.rstrip(DIGITS))
+            if last_column_number is not None:
+                padding = column_number - last_column_number - 1
+                if padding > 0:
+                    position += padding
+            last_column_number = column_number
+        if end_column is not None and position >= end_column:
+            break
+        position += 1
+        if position <= start_column:
+            continue
+
+        padding = position - start_column - len(values) - 1
+        if padding > 0:
+            values += [""] * padding
+        values.append(decode_cell(element, book))
+    return values
+
+
+def project_row(row, book, columns):
+    """
+    decode only the cells of the selected columns
+
+    columns maps a 1-based column number to its position in the result.
+    Other cells are stepped over by their reference alone, and the row
+    is left as soon as the last selected column is passed.
+    """
+    values = [""] * len(columns)
+    last_column_number = max(columns)
+    for column_number, element in iter_cells(row):
+        if column_number > last_column_number:
+            break
+        position = columns.get(column_number)
+        if position is not None:
+            values[position] = decode_cell(element, book)
+    return values
+
+
+def iter_cells(row):
+    """yield the 1-based column number and the element of every cell"""
+    column_number = 0
+    for element in row.iterchildren(CELL_TAG):
+        ref = element.get("r")
+        if ref:
+            column_number = column_to_number(ref.rstrip(DIGITS))
+        else:
+            column_number += 1
+        yield column_number, element
+
+
+def decode_cell(element, book):
+    value = ""
+    for node in element.iter(*VALUE_TAGS):
+        value = node.text
+    attributes = element.attrib
     cell_type = None
-    if cell.style_string:
-        date_time_flag = (
-            re.match(r"^\d+(\.\d+)?$", cell.value)
-            and re.match(".*[hsmdyY]", cell.style_string)
-            and not re.match(r".*\[.*[dmhys].*\]", cell.style_string)
-        )
-        if cell.style_string in FORMATS:
-            cell_type = FORMATS[cell.style_string]
-        elif date_time_flag:
-            if float(cell.value) < 1:
-                cell_type = "time"
-            else:
-                cell_type = "date"
-        elif re.match(r"^-?\d+(.\d+)?$", cell.value):
-            cell_type = "float"
-    return cell_type
-
-
-def parse_cell_value(cell, book):
-    if cell.column_type == "s":
-        cell.value = book.shared_strings[int(cell.value)]
-    elif cell.column_type == "b":
-        cell.value = (
-            (int(cell.value) == 1 and "TRUE")
-            or (int(cell.value) == 0 and "FALSE")
-            or cell.value
+    style_int = attributes.get("s")
+    if style_int:
+        style_type = book.cell_types[int(style_int)]
+        cell_type = parse_cell_type(style_type, value)
+    return parse_cell_value(value, attributes.get("t"), cell_type, book)
+
+
+def parse_cell_type(style_type, value):
+    if style_type == DATE_OR_FLOAT:
+        if DATE_VALUE_MATCHER.match(value):
+            if float(value) < 1:
+                return "time"
+            return "date"
+    elif style_type != FLOAT_OR_TEXT:
+        return style_type
+    if FLOAT_VALUE_MATCHER.match(value):
+        return "float"
+    return None
+
+
+def classify_style(style_string):
+    """
+    work out the cell type a number format implies, once per format
+
+    formats that look like dates still need the cell value to tell a
+    date from a time, and other unknown formats only give a float when
+    the value is numeric, hence the two markers.
+    """
+    if not style_string:
+        return None
+    if style_string in FORMATS:
+        return FORMATS[style_string]
+    if DATE_STYLE_MATCHER.match(style_string) and not (
+        DURATION_STYLE_MATCHER.match(style_string)
+    ):
+        return DATE_OR_FLOAT
+    return FLOAT_OR_TEXT
+
+
+def parse_cell_types(styles, xfs_styles):
+    """the cell type of every cellXfs entry, indexed like the s attribute"""
+    return [
+        classify_style(styles.get(str(xfs_style_int)))
+        for xfs_style_int in xfs_styles
+    ]
+
+
+def parse_cell_value(value, column_type, cell_type, book):
+    if column_type == "s":
+        return book.shared_strings[int(value)]
+    elif column_type == "b":
+        return (
+            (int(value) == 1 and "TRUE")
+            or (int(value) == 0 and "FALSE")
+            or value
         )
-    elif cell.column_type == "n":
-        parse_numeric_cell_value(cell, book)
+    elif column_type == "n" or column_type is None:
+        # t defaults to n, which is what most writers leave out
+        return parse_numeric_cell_value(value, cell_type, book)
     # else
     #   no action
+    return value
 
 
-def parse_numeric_cell_value(cell, book):
+def parse_numeric_cell_value(value, cell_type, book):
     try:
-        if cell.type == "date":  # date/time
-            if book.properties["date1904"]:
-                start = datetime(1904, 1, 1)
-            else:
-                start = datetime(1899, 12, 30)
-            cell.value = start + timedelta(float(cell.value))
-        elif cell.type == "time":  # time
-            # round to microseconds
-            seconds_in_total = int(
-                round((float(cell.value) % 1) * 24 * 60 * 60, 6)
-            )
-            minutes_in_total = int(seconds_in_total / 60)
-            second = int(minutes_in_total % 60)
-            hour = int(minutes_in_total / 60)
-            # str(t / 60) + ":" + ('0' + str(t % 60))[-2:]
-            cell.value = time(
-                hour=hour, minute=minutes_in_total % 60, second=second
-            )
-        elif cell.type == "float" and ("E" in cell.value or "e" in cell.value):
-            cell.value = ("%f" % (float(cell.value))).rstrip("0").rstrip(".")
+        if cell_type == "date":  # date/time
+            return parse_date(value, book.date1904)
+        elif cell_type == "time":  # time
+            return parse_time(value)
+        elif book.parse_number and value:
+            return book.parse_number(value)
+        elif cell_type == "float" and ("E" in value or "e" in value):
+            return ("%f" % (float(value))).rstrip("0").rstrip(".")
     except (ValueError, OverflowError):
         # invalid date format
         pass
+    return value
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(value, date1904):
+    """the datetime of a serial day, cached as ledgers repeat dates"""
+    return EPOCHS[bool(date1904)] + timedelta(float(value))
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_time(value):
+    """the time of day of a serial day, to the second"""
+    # round to microseconds
+    seconds_in_total = int(round((float(value) % 1) * 24 * 60 * 60, 6))
+    minutes_in_total, second = divmod(seconds_in_total, 60)
+    hour, minute = divmod(minutes_in_total, 60)
+    return time(hour=hour, minute=minute, second=second)
+
+
+def number_parser(auto_detect_int, auto_detect_float):
+    """
+    how the <v> text of number cells is converted, once per book
+
+    None keeps the text, as pyexcel-io does with both flags off.
+    """
+    if auto_detect_int and auto_detect_float:
+        return parse_number
+    elif auto_detect_int:
+        return parse_int
+    elif auto_detect_float:
+        return float
+    return None
+
+
+def parse_number(value):
+    if INT_VALUE_MATCHER.match(value):
+        return int(value)
+    return float(value)
+
+
+def parse_int(value):
+    if INT_VALUE_MATCHER.match(value):
+        return int(value)
+    return value
+
+
+# the number parsers by the code sidecar files record them with
+NUMBER_PARSERS = (None, parse_number, parse_int, float)
 
 
 def parse_styles(style_content):
@@ -321,7 +1780,7 @@ def parse_xfs_styles(style_content):
 
 
 def parse_book_properties(book_content):
-    properties = {"sheets": []}
+    properties = {"sheets": [], "sheet_states": []}
     date1904 = DATE_1904_MATCHER.findall(book_content)
     for apr in date1904:
         partial = io.BytesIO(apr)
@@ -351,14 +1810,28 @@ def parse_book_properties(book_content):
             if element.tag == "sheet":
                 value = element.attrib.get("name")
                 properties["sheets"].append(value)
+                state = element.attrib.get("state", "visible")
+                properties["sheet_states"].append(state)
     return properties
 
 
 def parse_shared_strings(content):
-    root = etree.fromstring(content)
-    for si in root.iterchildren():
-        content = ""
-        for text in si.iterchildren():
-            if text.text:
-                content += text.text
-        yield (content)
+    """yield each shared string from the xml bytes or a file object"""
+    if isinstance(content, bytes):
+        content = io.BytesIO(content)
+    for action, si in etree.iterparse(
+        content, events=("end",), tag=SHARED_STRING_TAG
+    ):
+        yield shared_string_text(si)
+        si.clear()
+        while si.getprevious() is not None:
+            del si.getparent()[0]
+
+
+def shared_string_text(si):
+    """the text of a <si> element"""
+    text = ""
+    for child in si.iterchildren():
+        if child.text:
+            text += child.text
+    return text
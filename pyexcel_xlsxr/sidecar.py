@@ -0,0 +1,252 @@
+"""
+pyexcel_xlsxr.sidecar
+~~~~~~~~~~~~~~~~~~~
+Persist decoded sheets in a compact, memory mappable binary file
+:copyright: (c) 2015-2020 by Onni Software Ltd & its contributors
+:license: New BSD License
+"""
+
+import mmap
+import struct
+from array import array
+from datetime import time, datetime, timedelta
+
+from pyexcel_xlsxr.files import atomic_write
+
+# magic, signature of the parts the rows came from, number parser, then
+# the row, column and string counts, padded to 8 bytes
+SIDECAR_HEADER = struct.Struct("<8s16sBxxxQQQ4x")
+SIDECAR_MAGIC = b"XLSXSC01"
+SIGNATURE = struct.Struct("<IIII")
+# the kind of every cell, stored column by column next to an 8 byte value
+EMPTY = 0
+FLOAT = 1
+INT = 2
+STRING = 3
+DATETIME = 4
+TIME = 5
+BIG_INT = 6
+NONE = 7
+INT64_RANGE = range(-(2**63), 2**63)
+UNIX_EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def aligned(size):
+    """the size rounded up to 8 bytes, so that every part is aligned"""
+    return (size + 7) & ~7
+
+
+class SidecarWriter(object):
+    """
+    lay out decoded rows as typed columns plus a string table
+
+    the file is, in order: the header, the length of every row, then the
+    kinds and the values of each column, then the string offsets and the
+    utf-8 strings.
+    """
+
+    def __init__(self, rows):
+        self.row_lengths = array("I", (len(row) for row in rows))
+        column_count = max(self.row_lengths, default=0)
+        self.strings = {}
+        self.string_table = []
+        self.columns = [
+            self.encode_column(rows, column) for column in range(column_count)
+        ]
+
+    def encode_column(self, rows, column):
+        kinds = bytearray(len(rows))
+        values = bytearray(8 * len(rows))
+        floats = memoryview(values).cast("d")
+        integers = memoryview(values).cast("q")
+        for index, row in enumerate(rows):
+            if column >= len(row):
+                continue
+            value = row[column]
+            value_type = type(value)
+            if value_type is str:
+                if value == "":
+                    continue
+                kinds[index] = STRING
+                integers[index] = self.intern(value)
+            elif value_type is float:
+                kinds[index] = FLOAT
+                floats[index] = value
+            elif value_type is int and value in INT64_RANGE:
+                kinds[index] = INT
+                integers[index] = value
+            elif value_type is datetime:
+                kinds[index] = DATETIME
+                integers[index] = (value - UNIX_EPOCH) // ONE_MICROSECOND
+            elif value_type is time:
+                kinds[index] = TIME
+                integers[index] = (
+                    datetime.combine(UNIX_EPOCH, value) - UNIX_EPOCH
+                ) // ONE_MICROSECOND
+            elif value is None:
+                kinds[index] = NONE
+            elif value_type is int:
+                kinds[index] = BIG_INT
+                integers[index] = self.intern(str(value))
+            else:
+                raise TypeError(
+                    "Cannot store %s in a sidecar" % value_type.__name__
+                )
+        floats.release()
+        integers.release()
+        return kinds, values
+
+    def intern(self, text):
+        index = self.strings.get(text)
+        if index is None:
+            index = self.strings[text] = len(self.string_table)
+            self.string_table.append(text.encode("utf-8"))
+        return index
+
+    def save(self, path, signature, parser_code):
+        with atomic_write(path) as sidecar_file:
+            sidecar_file.write(
+                SIDECAR_HEADER.pack(
+                    SIDECAR_MAGIC,
+                    SIGNATURE.pack(*signature),
+                    parser_code,
+                    len(self.row_lengths),
+                    len(self.columns),
+                    len(self.string_table),
+                )
+            )
+            write_aligned(sidecar_file, self.row_lengths.tobytes())
+            for kinds, values in self.columns:
+                write_aligned(sidecar_file, kinds)
+                sidecar_file.write(values)
+            offsets = array("Q", [0])
+            for text in self.string_table:
+                offsets.append(offsets[-1] + len(text))
+            sidecar_file.write(offsets.tobytes())
+            sidecar_file.write(b"".join(self.string_table))
+
+
+def write_aligned(sidecar_file, data):
+    sidecar_file.write(data)
+    sidecar_file.write(bytes(aligned(len(data)) - len(data)))
+
+
+def save_sidecar(path, rows, signature, parser_code):
+    SidecarWriter(rows).save(path, signature, parser_code)
+
+
+def load_sidecar(path, signature, parser_code):
+    """
+    the rows of a sidecar, if there is a valid one, else None
+
+    the file is memory mapped and each row is only built when it is
+    iterated.
+    """
+    try:
+        with open(path, "rb") as sidecar_file:
+            mapping = mmap.mmap(
+                sidecar_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+    except (OSError, ValueError):
+        # missing, unreadable or empty
+        return None
+    if len(mapping) < SIDECAR_HEADER.size:
+        mapping.close()
+        return None
+    magic, stored, stored_parser, row_count, column_count, string_count = (
+        SIDECAR_HEADER.unpack_from(mapping)
+    )
+    valid = (
+        magic == SIDECAR_MAGIC
+        and stored == SIGNATURE.pack(*signature)
+        and stored_parser == parser_code
+    )
+    if not valid:
+        mapping.close()
+        return None
+    return iter_sidecar_rows(mapping, row_count, column_count, string_count)
+
+
+class MappedParts(object):
+    """the consecutive, aligned parts of a mapped sidecar, as views"""
+
+    def __init__(self, mapping):
+        self.mapping = mapping
+        self.view = memoryview(mapping)
+        self.views = [self.view]
+        self.position = SIDECAR_HEADER.size
+
+    def take(self, size, format_character="B"):
+        start = self.position
+        end = start + size
+        part = self.view[start:end].cast(format_character)
+        self.views.append(part)
+        self.position += aligned(size)
+        return part
+
+    def cast(self, part, format_character):
+        cast = part.cast(format_character)
+        self.views.append(cast)
+        return cast
+
+    def rest(self):
+        return self.take(len(self.mapping) - self.position)
+
+    def close(self):
+        for part in reversed(self.views):
+            part.release()
+        self.mapping.close()
+
+
+def iter_sidecar_rows(mapping, row_count, column_count, string_count):
+    parts = MappedParts(mapping)
+    try:
+        row_lengths = parts.take(4 * row_count, "I")
+        columns = []
+        for _ in range(column_count):
+            kinds = parts.take(row_count)
+            values = parts.take(8 * row_count)
+            columns.append(
+                (kinds, parts.cast(values, "d"), parts.cast(values, "q"))
+            )
+        offsets = parts.take(8 * (string_count + 1), "Q")
+        strings = parts.rest()
+        decoded = {}
+
+        def string_at(index):
+            text = decoded.get(index)
+            if text is None:
+                start, end = offsets[index], offsets[index + 1]
+                text = decoded[index] = str(strings[start:end], "utf-8")
+            return text
+
+        for index in range(row_count):
+            row = []
+            length = row_lengths[index]
+            for kinds, floats, integers in columns[:length]:
+                kind = kinds[index]
+                if kind == EMPTY:
+                    row.append("")
+                elif kind == FLOAT:
+                    row.append(floats[index])
+                elif kind == INT:
+                    row.append(integers[index])
+                elif kind == STRING:
+                    row.append(string_at(integers[index]))
+                elif kind == DATETIME:
+                    microseconds = integers[index]
+                    row.append(
+                        UNIX_EPOCH + timedelta(microseconds=microseconds)
+                    )
+                elif kind == TIME:
+                    microseconds = integers[index]
+                    moment = UNIX_EPOCH + timedelta(microseconds=microseconds)
+                    row.append(moment.time())
+                elif kind == NONE:
+                    row.append(None)
+                else:
+                    row.append(int(string_at(integers[index])))
+            yield row
+    finally:
+        parts.close()
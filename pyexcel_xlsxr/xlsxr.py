@@ -1,9 +1,27 @@
 from io import BytesIO
-from datetime import date, time, datetime
+from itertools import chain, repeat
 
 import pyexcel_io.service as service
 from pyexcel_io.plugin_api import ISheet, IReader, NamedContent
-from pyexcel_xlsxr.messy_xlsx import XLSXBookSet
+from pyexcel_xlsxr.columnar import (
+    INFER_ROWS,
+    RECORD_BATCH_SIZE,
+    read_columns,
+    iter_record_batches,
+)
+from pyexcel_xlsxr.messy_xlsx import (
+    ROW_BLOCK_SIZE,
+    SPOOL_THRESHOLD,
+    SHARED_STRINGS_IN_MEMORY,
+    XLSXTable,
+    XLSXBookSet,
+    XLSXTableFuture,
+    XLSXChunkedTable,
+    iter_blocks,
+)
+
+# tables whose rows come from decode_row(), with numbers already converted
+DECODED_TABLES = (XLSXTable, XLSXTableFuture, XLSXChunkedTable)
 
 
 class XLSXSheet(ISheet):
@@ -13,44 +31,160 @@ class XLSXSheet(ISheet):
         auto_detect_int=True,
         auto_detect_float=True,
         auto_detect_datetime=True,
+        ignore_infinity=True,
+        columns=None,
+        seek_row=0,
+        column_window=(0, -1),
     ):
         self.xlsx_sheet = sheet
+        self.__columns = columns
+        self.__seek_row = seek_row
+        self.__start_column, self.__column_limit = column_window
         self.__auto_detect_int = auto_detect_int
         self.__auto_detect_float = auto_detect_float
         self.__auto_detect_datetime = auto_detect_datetime
+        self.__ignore_infinity = ignore_infinity
+        # text cells of the workbook's own tables are text, not numbers
+        self.__typed = isinstance(sheet, DECODED_TABLES)
 
     def row_iterator(self):
+        if isinstance(self.xlsx_sheet, XLSXTable):
+            if not self.__columns:
+                rows = self.xlsx_sheet.stored_rows()
+                if rows is not None:
+                    return rows
+            # pyexcel-io skips rows before start_row and stops at
+            # row_limit on its own, so rows are decoded only on demand.
+            # With a row index, the rows before the indexed row nearest
+            # to seek_row are not even parsed, and empty placeholders
+            # keep pyexcel-io's row count right.
+            first_row, rows = self.xlsx_sheet.rows_from(self.__seek_row)
+            return chain(repeat([], first_row), rows)
         return self.xlsx_sheet.raw()
 
     def column_iterator(self, row):
-        for cell in row:
-            yield self.__convert_cell(cell)
+        if not isinstance(row, list):
+            if self.__columns:
+                row = self.xlsx_sheet.decode(row, self.__columns)
+            else:
+                # pyexcel-io drops the first start_column cells itself,
+                # so they are left as placeholders and never decoded
+                start_column = self.__start_column
+                row = [""] * start_column + self.xlsx_sheet.decode(
+                    row,
+                    start_column=start_column,
+                    column_limit=self.__column_limit,
+                )
+        if self.__typed:
+            return iter(row)
+        return map(self.__convert_cell, row)
+
+    def iter_record_batches(
+        self, batch_size=RECORD_BATCH_SIZE, header=False, infer_rows=INFER_ROWS
+    ):
+        """
+        yield the sheet as pyarrow RecordBatches of batch_size rows
+
+        see pyexcel_xlsxr.columnar.iter_record_batches. pyarrow is
+        needed, and sheets read by pool workers are not supported.
+        """
+        if not isinstance(self.xlsx_sheet, XLSXTable):
+            raise NotImplementedError(
+                "Record batches are not available with workers"
+            )
+        return iter_record_batches(
+            self.xlsx_sheet,
+            batch_size,
+            self.__columns,
+            header=header,
+            infer_rows=infer_rows,
+        )
+
+    def iter_row_blocks(self, size=ROW_BLOCK_SIZE):
+        """
+        yield lists of at most size rows, converted like column_iterator()
+
+        the cells of a block are converted in one loop, instead of
+        through a generator per row and a call per cell. Rows of the
+        workbook's own tables need no conversion at all.
+        """
+        if isinstance(self.xlsx_sheet, XLSXTable):
+            rows = self.xlsx_sheet.raw(columns=self.__columns)
+        else:
+            rows = self.xlsx_sheet.raw()
+        if self.__typed:
+            yield from iter_blocks(rows, size)
+            return
+        convert_text = self.__convert_text
+        for block in iter_blocks(rows, size):
+            for row in block:
+                for index, cell in enumerate(row):
+                    if cell.__class__ is str:
+                        row[index] = convert_text(cell)
+            yield block
 
     def __convert_cell(self, cell):
-        if cell is None:
-            return None
-        if isinstance(cell, (datetime, date, time)):
-            return cell
-        ret = None
         if isinstance(cell, str):
-            if self.__auto_detect_int:
-                ret = service.detect_int_value(cell)
-            if ret is None and self.__auto_detect_float:
-                ret = service.detect_float_value(cell)
-                shall_we_ignore_the_conversion = (
-                    ret in [float("inf"), float("-inf")]
-                ) and self.__ignore_infinity
-                if shall_we_ignore_the_conversion:
-                    ret = None
+            return self.__convert_text(cell)
+        return cell
+
+    def __convert_text(self, text):
+        ret = None
+        if self.__auto_detect_int:
+            ret = service.detect_int_value(text)
+        if ret is None and self.__auto_detect_float:
+            ret = service.detect_float_value(text)
+            shall_we_ignore_the_conversion = (
+                ret in [float("inf"), float("-inf")]
+            ) and self.__ignore_infinity
+            if shall_we_ignore_the_conversion:
+                ret = None
         if ret is None:
-            ret = cell
+            ret = text
         return ret
 
 
 class XLSXBook(IReader):
-    def __init__(self, file_alike_object, _, **keywords):
-        self.xlsx_book = XLSXBookSet(file_alike_object)
+    def __init__(
+        self,
+        file_alike_object,
+        _,
+        shared_strings=SHARED_STRINGS_IN_MEMORY,
+        spool_threshold=SPOOL_THRESHOLD,
+        use_mmap=False,
+        row_index=False,
+        row_index_dir=None,
+        seek_row=0,
+        column_window=(0, -1),
+        workers=None,
+        sheet_chunk_size=None,
+        columns=None,
+        cache=None,
+        sidecar=False,
+        sidecar_dir=None,
+        **keywords
+    ):
+        self.xlsx_book = XLSXBookSet(
+            file_alike_object,
+            shared_strings=shared_strings,
+            spool_threshold=spool_threshold,
+            use_mmap=use_mmap,
+            row_index=row_index,
+            row_index_dir=row_index_dir,
+            cache=cache,
+            sidecar=sidecar,
+            sidecar_dir=sidecar_dir,
+            auto_detect_int=keywords.get("auto_detect_int", True),
+            auto_detect_float=keywords.get("auto_detect_float", True),
+        )
         self._keywords = keywords
+        # sheets are parsed in a process pool only for files on disk
+        self._workers = workers if self.xlsx_book.file_name else None
+        self._sheet_chunk_size = sheet_chunk_size
+        self._pool = None
+        self._columns = columns
+        self._seek_row = seek_row
+        self._column_window = column_window
         tables = self.xlsx_book.make_tables()
         self.content_array = [
             NamedContent(table.name, table) for table in tables
@@ -59,10 +193,49 @@ class XLSXBook(IReader):
     def read_sheet(self, sheet_index):
         """read a sheet at a specified index"""
         table = self.content_array[sheet_index].payload
-        sheet = XLSXSheet(table, **self._keywords)
+        columns = None
+        if self._columns:
+            columns = table.resolve_columns(self._columns)
+        if self._workers:
+            # pyexcel-io asks for every sheet before reading any row,
+            # so all requested sheets end up being parsed side by side
+            if self._pool is None:
+                self._pool = self.xlsx_book.make_pool(self._workers)
+            if self._sheet_chunk_size:
+                table = XLSXChunkedTable(
+                    table,
+                    self._pool,
+                    self._sheet_chunk_size,
+                    self._workers,
+                    columns,
+                )
+            else:
+                table = self.xlsx_book.submit(self._pool, table, columns)
+        sheet = XLSXSheet(
+            table,
+            columns=columns,
+            seek_row=self._seek_row,
+            column_window=self._column_window,
+            **self._keywords
+        )
         return sheet
 
+    def read_columns(self, sheet_index, start_row=0):
+        """
+        read a sheet at a specified index into typed columns
+
+        see pyexcel_xlsxr.columnar.Column. The sheet is read here, not
+        in the worker pool.
+        """
+        table = self.content_array[sheet_index].payload
+        columns = None
+        if self._columns:
+            columns = table.resolve_columns(self._columns)
+        return read_columns(table, columns, start_row)
+
     def close(self):
+        if self._pool:
+            self._pool.shutdown(cancel_futures=True)
         self.xlsx_book.close()
 
 
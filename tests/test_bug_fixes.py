@@ -129,5 +129,17 @@ def test_issue_5():
     assert list(data) == [[None, 11, 11]]
 
 
+def test_infinity_text_is_kept():
+    native_sheet = MagicMock(
+        name="test", raw=MagicMock(return_value=[["inf", "-inf", "1.5"]])
+    )
+    from pyexcel_xlsxr.xlsxr import XLSXSheet
+
+    sheet = EncapsulatedSheetReader(XLSXSheet(native_sheet))
+    assert list(sheet.to_array()) == [["inf", "-inf", 1.5]]
+    blocks = list(XLSXSheet(native_sheet).iter_row_blocks())
+    assert blocks == [[["inf", "-inf", 1.5]]]
+
+
 def get_fixture(file_name):
     return os.path.join("tests", "fixtures", file_name)
@@ -0,0 +1,154 @@
+import os
+import stat
+import pickle
+import shutil
+from io import BytesIO
+
+import pytest
+from pyexcel_xlsxr import get_data, messy_xlsx
+from pyexcel_xlsxr.cache import WorkbookCache
+
+FILE_NAME = os.path.join("tests", "fixtures", "issue_1.xlsx")
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    calls = []
+    parse_shared_strings = messy_xlsx.parse_shared_strings
+
+    def spy(content):
+        calls.append(content)
+        return parse_shared_strings(content)
+
+    monkeypatch.setattr(messy_xlsx, "parse_shared_strings", spy)
+    return calls
+
+
+def test_workbook_is_parsed_once(parsed):
+    cache = WorkbookCache()
+    expected = get_data(FILE_NAME)
+    assert get_data(FILE_NAME, cache=cache) == expected
+    assert get_data(FILE_NAME, cache=cache) == expected
+    assert len(parsed) == 2
+
+
+def test_streams_are_keyed_by_content(parsed):
+    cache = WorkbookCache()
+    with open(FILE_NAME, "rb") as workbook:
+        content = workbook.read()
+    get_data(BytesIO(content), file_type="xlsx", cache=cache)
+    get_data(BytesIO(content), file_type="xlsx", cache=cache)
+    assert len(parsed) == 1
+
+
+def test_decoded_sheets_are_cached(monkeypatch):
+    cache = WorkbookCache(cache_sheets=True)
+    expected = get_data(FILE_NAME)
+    assert get_data(FILE_NAME, cache=cache) == expected
+
+    def no_xml(stream):
+        raise AssertionError("the sheet xml was read again")
+
+    monkeypatch.setattr(messy_xlsx, "iter_sheet_rows", no_xml)
+    assert get_data(FILE_NAME, cache=cache) == expected
+
+
+def test_disk_cache_outlives_the_cache(tmp_path, parsed):
+    get_data(FILE_NAME, cache=WorkbookCache(directory=str(tmp_path)))
+    get_data(FILE_NAME, cache=WorkbookCache(directory=str(tmp_path)))
+    assert len(parsed) == 1
+    # workbook properties and shared strings, no cell is styled
+    assert len(os.listdir(str(tmp_path))) == 2
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = WorkbookCache(max_bytes=300)
+    cache.put("a", b"a" * 100)
+    cache.put("b", b"b" * 100)
+    cache.get("a")
+    cache.put("c", b"c" * 100)
+    assert cache.get("b") is None
+    assert cache.get("a") == b"a" * 100
+    assert cache.size <= 300
+
+
+def test_changed_files_get_a_new_key(tmp_path):
+    file_name = str(tmp_path / "changed.xlsx")
+    with open(FILE_NAME, "rb") as source, open(file_name, "wb") as copy:
+        copy.write(source.read())
+    cache = WorkbookCache()
+    key = cache.key_for(file_name)
+    os.utime(file_name, ns=(0, 0))
+    assert cache.key_for(file_name) != key
+    with open(file_name, "rb") as stream:
+        key = WorkbookCache().key_for(stream)
+    assert WorkbookCache(hash_files=True).key_for(file_name) == key
+
+
+def test_memory_hits_are_not_unpickled(monkeypatch):
+    cache = WorkbookCache()
+    entry = {"sheets": ["a"]}
+    cache.put("a", entry)
+
+    def no_loads(data):
+        raise AssertionError("a memory hit was unpickled")
+
+    monkeypatch.setattr(pickle, "loads", no_loads)
+    assert cache.get("a") is entry
+
+
+def test_disk_cache_directory_is_private(tmp_path):
+    directory = str(tmp_path / "cache")
+    WorkbookCache(directory=directory).put("a", [1])
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+    assert WorkbookCache(directory=directory).get("a") == [1]
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="no file owners")
+def test_files_others_may_write_are_not_loaded(tmp_path):
+    directory = str(tmp_path / "cache")
+    WorkbookCache(directory=directory).put("a", [1])
+    os.chmod(directory, 0o777)
+    assert WorkbookCache(directory=directory).get("a") is None
+    os.chmod(directory, 0o700)
+    for name in os.listdir(directory):
+        os.chmod(os.path.join(directory, name), 0o666)
+    assert WorkbookCache(directory=directory).get("a") is None
+
+
+def test_cached_shared_strings_outlive_the_book():
+    cache = WorkbookCache()
+    expected = get_data(FILE_NAME)
+    for shared_strings in ["disk", "index"]:
+        for _ in range(2):
+            data = get_data(
+                FILE_NAME, cache=cache, shared_strings=shared_strings
+            )
+            assert data == expected
+        cache.clear()
+
+
+def test_disk_cache_outlives_the_workbook(tmp_path):
+    directory = str(tmp_path / "cache")
+    upload = str(tmp_path / "upload1.xlsx")
+    copy = str(tmp_path / "upload2.xlsx")
+    for file_name in [upload, copy]:
+        shutil.copy(FILE_NAME, file_name)
+    expected = get_data(FILE_NAME)
+    cache = WorkbookCache(directory=directory, hash_files=True)
+    assert get_data(upload, cache=cache, shared_strings="index") == expected
+    os.remove(upload)
+    # a new cache, as after a restart, with nothing in memory
+    cache = WorkbookCache(directory=directory, hash_files=True)
+    assert get_data(copy, cache=cache, shared_strings="index") == expected
+
+
+def test_broken_disk_entries_are_misses(tmp_path):
+    directory = str(tmp_path / "cache")
+    WorkbookCache(directory=directory).put("a", [1])
+    (name,) = os.listdir(directory)
+    path = os.path.join(directory, name)
+    with open(path, "r+b") as cache_file:
+        cache_file.truncate(5)
+    assert WorkbookCache(directory=directory).get("a") is None
+    assert not os.path.exists(path)
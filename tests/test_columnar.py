@@ -0,0 +1,130 @@
+import os
+import sys
+import subprocess
+from datetime import datetime
+
+import pytest
+import pyexcel
+from pyexcel_xlsxr.xlsxr import XLSXBook
+from pyexcel_xlsxr.columnar import Column
+
+
+@pytest.fixture
+def numeric_file(tmp_path):
+    file_name = str(tmp_path / "numeric.xlsx")
+    rows = [
+        ["id", "price", "note"],
+        [1, 1.5, "a"],
+        [2, "", 3],
+        [3, 2.25, ""],
+    ]
+    pyexcel.save_as(array=rows, dest_file_name=file_name)
+    return file_name
+
+
+def test_read_columns(numeric_file):
+    book = XLSXBook(numeric_file, "xlsx")
+    ids, prices, notes = book.read_columns(0, start_row=1)
+    book.close()
+    assert ids.kind == "float"
+    assert ids.values.typecode == "d"
+    assert list(ids.values) == [1.0, 2.0, 3.0]
+    assert prices.kind == "float"
+    assert list(prices.mask) == [0, 1, 0]
+    assert prices.to_list() == [1.5, None, 2.25]
+    assert notes.kind == "object"
+    assert notes.to_list() == ["a", 3.0, None]
+
+
+def test_read_columns_with_header(numeric_file):
+    book = XLSXBook(numeric_file, "xlsx", columns=["price"])
+    (prices,) = book.read_columns(0)
+    book.close()
+    assert prices.to_list() == ["price", 1.5, None, 2.25]
+
+
+def test_read_date_columns():
+    file_name = os.path.join("tests", "fixtures", "date_field.xlsx")
+    book = XLSXBook(file_name, "xlsx")
+    dates = book.read_columns(0, start_row=1)[0]
+    book.close()
+    assert dates.kind == "datetime"
+    assert dates.values.typecode == "d"
+    assert dates.to_list()[:2] == [
+        datetime(2014, 12, 25),
+        datetime(2014, 12, 26),
+    ]
+
+
+def test_to_numpy(numeric_file):
+    numpy = pytest.importorskip("numpy")
+    book = XLSXBook(numeric_file, "xlsx")
+    ids, prices, notes = book.read_columns(0, start_row=1)
+    book.close()
+    assert prices.to_numpy().dtype == numpy.float64
+    assert prices.to_numpy().mask.tolist() == [False, True, False]
+    assert notes.to_numpy().dtype == object
+    file_name = os.path.join("tests", "fixtures", "date_field.xlsx")
+    book = XLSXBook(file_name, "xlsx")
+    dates = book.read_columns(0, start_row=1)[0].to_numpy()
+    book.close()
+    assert dates.dtype == numpy.dtype("datetime64[us]")
+    assert dates[0] == numpy.datetime64("2014-12-25")
+
+
+def test_empty_column():
+    column = Column()
+    column.pad(2)
+    assert column.to_list() == [None, None]
+
+
+def test_iter_record_batches(numeric_file):
+    pyarrow = pytest.importorskip("pyarrow")
+    book = XLSXBook(numeric_file, "xlsx")
+    sheet = book.read_sheet(0)
+    batches = list(sheet.iter_record_batches(batch_size=2, header=True))
+    book.close()
+    assert [batch.num_rows for batch in batches] == [2, 1]
+    assert batches[0].schema == pyarrow.schema(
+        [
+            pyarrow.field("id", pyarrow.float64()),
+            pyarrow.field("price", pyarrow.float64()),
+            pyarrow.field("note", pyarrow.string()),
+        ]
+    )
+    table = pyarrow.Table.from_batches(batches)
+    assert table.column("price").to_pylist() == [1.5, None, 2.25]
+    assert table.column("note").to_pylist() == ["a", "3.0", None]
+
+
+def test_iter_record_batches_of_dates():
+    pyarrow = pytest.importorskip("pyarrow")
+    file_name = os.path.join("tests", "fixtures", "date_field.xlsx")
+    book = XLSXBook(file_name, "xlsx", columns=["Date"])
+    sheet = book.read_sheet(0)
+    (batch,) = sheet.iter_record_batches(header=True)
+    book.close()
+    assert batch.schema.field("Date").type == pyarrow.timestamp("us")
+    assert batch.column(0)[0].as_py() == datetime(2014, 12, 25)
+
+
+@pytest.mark.parametrize("last_row", [["x"], [3, 4]])
+def test_record_batches_outgrow_the_schema(tmp_path, last_row):
+    pytest.importorskip("pyarrow")
+    file_name = str(tmp_path / "outgrown.xlsx")
+    pyexcel.save_as(array=[[1], [2], last_row], dest_file_name=file_name)
+    book = XLSXBook(file_name, "xlsx")
+    sheet = book.read_sheet(0)
+    batches = sheet.iter_record_batches(batch_size=1, infer_rows=2)
+    with pytest.raises(ValueError):
+        list(batches)
+    book.close()
+
+
+def test_reading_rows_does_not_import_numpy_or_pyarrow():
+    script = (
+        "import sys, pyexcel_xlsxr.xlsxr;"
+        + "print('numpy' in sys.modules or 'pyarrow' in sys.modules)"
+    )
+    output = subprocess.check_output([sys.executable, "-c", script])
+    assert output.strip() == b"False"
@@ -0,0 +1,24 @@
+import os
+
+import pytest
+from pyexcel_xlsxr.files import atomic_write
+
+
+def test_atomic_write_replaces_the_file(tmp_path):
+    path = str(tmp_path / "out.bin")
+    with open(path, "wb") as output:
+        output.write(b"old")
+    with atomic_write(path) as output:
+        output.write(b"new")
+    with open(path, "rb") as written:
+        assert written.read() == b"new"
+    assert os.listdir(str(tmp_path)) == ["out.bin"]
+
+
+def test_failed_write_leaves_nothing_behind(tmp_path):
+    path = str(tmp_path / "out.bin")
+    with pytest.raises(OSError):
+        with atomic_write(path) as output:
+            output.write(b"partial")
+            raise OSError("No space left on device")
+    assert os.listdir(str(tmp_path)) == []
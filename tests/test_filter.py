@@ -2,6 +2,9 @@ import os
 import unittest
 
 from pyexcel_io import get_data, save_data
+from pyexcel_xlsxr import get_data as xlsxr_get_data
+from pyexcel_xlsxr import messy_xlsx
+from pyexcel_xlsxr.messy_xlsx import XLSXBookSet
 
 
 class TestFilter(unittest.TestCase):
@@ -71,5 +74,97 @@ class TestFilter(unittest.TestCase):
         expected = [[24]]
         assert filtered_data[self.sheet_name] == expected
 
+    def test_filter_rows_are_not_decoded(self):
+        decoded = []
+        decode_row = messy_xlsx.decode_row
+
+        def spy(row, *args, **keywords):
+            decoded.append(row.get("r"))
+            return decode_row(row, *args, **keywords)
+
+        messy_xlsx.decode_row = spy
+        try:
+            get_data(
+                self.test_file,
+                start_row=3,
+                row_limit=1,
+                library="pyexcel-xlsxr",
+            )
+        finally:
+            messy_xlsx.decode_row = decode_row
+        assert decoded == ["4"]
+
+    def test_filter_cells_outside_the_window_are_not_decoded(self):
+        decoded = []
+        decode_cell = messy_xlsx.decode_cell
+
+        def spy(element, book):
+            decoded.append(element.get("r"))
+            return decode_cell(element, book)
+
+        messy_xlsx.decode_cell = spy
+        try:
+            filtered_data = xlsxr_get_data(
+                self.test_file,
+                start_column=1,
+                column_limit=1,
+                start_row=3,
+                row_limit=1,
+            )
+        finally:
+            messy_xlsx.decode_cell = decode_cell
+        assert filtered_data[self.sheet_name] == [[24]]
+        assert decoded == ["B4"]
+
+    def test_filter_in_raw(self):
+        book = XLSXBookSet(self.test_file)
+        table = next(book.make_tables())
+        rows = list(
+            table.raw(start_row=3, row_limit=2, start_column=1, column_limit=1)
+        )
+        book.close()
+        assert rows == [[24], [25]]
+
+    def test_filter_columns(self):
+        filtered_data = get_data(
+            self.test_file,
+            columns=["C", 0],
+            start_row=4,
+            library="pyexcel-xlsxr",
+        )
+        expected = [[35, 5], [36, 6]]
+        assert filtered_data[self.sheet_name] == expected
+
+    def test_filter_columns_by_header(self):
+        save_data(self.test_file, [["id", "name"], [1, "a"], [2, "b"]])
+        filtered_data = get_data(
+            self.test_file, columns=["name"], library="pyexcel-xlsxr"
+        )
+        assert filtered_data[self.sheet_name] == [["name"], ["a"], ["b"]]
+
+    def test_filter_unknown_column(self):
+        with self.assertRaises(ValueError):
+            get_data(
+                self.test_file, columns=["no such"], library="pyexcel-xlsxr"
+            )
+
+    def test_filter_duplicate_column(self):
+        with self.assertRaises(ValueError):
+            get_data(
+                self.test_file, columns=["A", "A"], library="pyexcel-xlsxr"
+            )
+
+    def test_filter_negative_column(self):
+        with self.assertRaises(ValueError):
+            get_data(self.test_file, columns=[-1], library="pyexcel-xlsxr")
+
+    def test_filter_columns_in_raw(self):
+        book = XLSXBookSet(self.test_file)
+        table = next(book.make_tables())
+        columns = table.resolve_columns(["B", "A"])
+        rows = list(table.raw(row_limit=2, columns=columns))
+        book.close()
+        assert rows == [[21, 1], [22, 2]]
+
     def tearDown(self):
         os.unlink(self.test_file)
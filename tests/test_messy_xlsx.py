@@ -1,11 +1,26 @@
+import pickle
+from io import BytesIO
 from datetime import time, datetime
 
+import pytest
 from pyexcel_xlsxr.messy_xlsx import (
+    XLSX_ROW_MATCH,
+    SharedStrings,
+    IndexedSharedStrings,
+    SpilledSharedStrings,
+    IncrementalSharedStrings,
+    iter_rows,
     parse_row,
     find_sheets,
+    parse_sheet,
+    parse_date,
+    parse_time,
+    split_sheet,
     parse_styles,
+    classify_style,
     get_sheet_index,
     column_to_number,
+    parse_cell_types,
     parse_xfs_styles,
     parse_shared_strings,
     parse_book_properties,
@@ -127,7 +142,9 @@ def test_parse_row():
         def __init__(self):
             self.xfs_styles = [1, 1, 2]
             self.styles = {"1": "dd/mm/yy", "2": "h:mm:ss;@"}
+            self.cell_types = parse_cell_types(self.styles, self.xfs_styles)
             self.properties = {"date1904": False}
+            self.date1904 = False
 
     data = parse_row(xml_string, Book())
     assert [cell for cell in data] == [
@@ -136,6 +153,118 @@ def test_parse_row():
     ]
 
 
+def test_parse_sheet():
+    xml_string = b"""
+      <worksheet
+        xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+        xmlns:x14ac="http://schemas.microsoft.com/office/spreadsheetml/2009/9/ac">
+        <sheetData>
+        <row r="1" x14ac:dyDescent="0.25">
+          <c r="A1" t="inlineStr"><is><t>a</t></is></c>
+          <c r="C1" t="n"><v>1</v></c>
+        </row>
+        <row r="2"><c r="B2" t="n"><v>2</v></c></row>
+        </sheetData>
+      </worksheet>"""
+
+    class Book:
+        xfs_styles = []
+        styles = {}
+        cell_types = []
+        properties = {"date1904": False}
+        date1904 = False
+        parse_number = None
+
+    data = list(parse_sheet(BytesIO(xml_string), Book()))
+    assert data == [["a", "", "1"], ["2"]]
+
+
+def test_split_sheet():
+    xml_string = (
+        b'<?xml version="1.0"?><x:worksheet xmlns:x="http://schemas.'
+        b'openxmlformats.org/spreadsheetml/2006/main"><x:sheetData>'
+        + b"".join(
+            b'<row r="%d"><c r="A%d" t="n"><v>%d</v></c></row>' % (i, i, i)
+            for i in range(1, 8)
+        )
+        + b"</x:sheetData></x:worksheet>"
+    )
+
+    class Book:
+        cell_types = []
+        parse_number = None
+
+    documents = list(split_sheet(BytesIO(xml_string), chunk_size=100))
+    assert len(documents) == 3
+    rows = [
+        row
+        for document in documents
+        for row in parse_sheet(BytesIO(document), Book())
+    ]
+    assert rows == [[str(i)] for i in range(1, 8)]
+
+
+def test_split_sheet_with_prefixed_and_self_closing_rows():
+    xml_string = (
+        b'<?xml version="1.0"?><x:worksheet xmlns:x="http://schemas.'
+        b'openxmlformats.org/spreadsheetml/2006/main"><x:sheetData>'
+        + b"".join(
+            b'<x:row r="%d"><x:c r="A%d" t="n"><x:v>%d</x:v></x:c></x:row>'
+            % (i, i, i)
+            for i in range(1, 6)
+        )
+        + b'<x:row r="6"/><x:row r="7" spans="1:1"/>'
+        + b"</x:sheetData><x:rowBreaks/></x:worksheet>"
+    )
+
+    class Book:
+        cell_types = []
+        parse_number = None
+
+    for chunk_size in (1, 100, len(xml_string)):
+        documents = list(split_sheet(BytesIO(xml_string), chunk_size))
+        rows = [
+            row
+            for document in documents
+            for row in parse_sheet(BytesIO(document), Book())
+        ]
+        assert rows == [[str(i)] for i in range(1, 6)] + [[], []]
+
+
+def test_iter_rows_keeps_rows_split_across_chunks():
+    sample = (
+        b'<x:sheetData><x:row r="1"><x:c r="A1"><x:v>1</x:v></x:c></x:row>'
+        b'<x:row r="2"/><row r="3"/></x:sheetData><x:rowBreaks/>'
+    )
+    expected = [
+        b'<x:row r="1"><x:c r="A1"><x:v>1</x:v></x:c></x:row>',
+        b'<x:row r="2"/>',
+        b'<row r="3"/>',
+    ]
+    for chunk_size in (1, 2, 5, len(sample)):
+        rows = list(iter_rows(BytesIO(sample), chunk_size=chunk_size))
+        assert rows == expected
+
+
+def test_split_empty_sheet():
+    xml_string = b"<worksheet><sheetData/></worksheet>"
+    assert list(split_sheet(BytesIO(xml_string))) == []
+
+
+def test_classify_style():
+    assert classify_style(None) is None
+    assert classify_style("dd/mm/yy") == "date"
+    assert classify_style("h:mm:ss;@") == "date_or_float"
+    assert classify_style("[h]:mm:ss;@") == "float_or_text"
+    assert classify_style("0.000") == "float_or_text"
+
+
+def test_parse_cell_types():
+    styles = {"164": "general", "165": "yyyy-mm-dd"}
+    cell_types = parse_cell_types(styles, [0, 164, 165])
+    assert cell_types == [None, "float", "date_or_float"]
+
+
 def test_parse_styles():
     sample = b"""
      <styleSheet
@@ -162,7 +291,11 @@ def test_parse_properties():
         b"\n", b" "
     )
     properties = parse_book_properties(sample)
-    assert properties == {"date1904": False, "sheets": []}
+    assert properties == {
+        "date1904": False,
+        "sheets": [],
+        "sheet_states": [],
+    }
 
 
 def test_parse_sheet_properties():
@@ -177,7 +310,10 @@ def test_parse_sheet_properties():
         b"\n", b" "
     )
     properties = parse_book_properties(sample)
-    assert properties == {"sheets": ["Sheet1", "Sheet2", "Sheet3"]}
+    assert properties == {
+        "sheets": ["Sheet1", "Sheet2", "Sheet3"],
+        "sheet_states": ["visible", "visible", "visible"],
+    }
 
 
 def test_parse_xfs_styles():
@@ -216,6 +352,83 @@ def test_parse_shared_strings():
     assert list(content) == ["Date", "Time"]
 
 
+def test_parse_shared_strings_from_stream():
+    sample = BytesIO(
+        b'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/'
+        b'main"><si><t>a</t></si><si><t/></si><si><t>\xc3\xa9</t></si></sst>'
+    )
+    assert list(parse_shared_strings(sample)) == ["a", "", "\u00e9"]
+
+
+def test_shared_strings():
+    strings = SharedStrings(["Date", "", "\u00e9t\u00e9", "Time"])
+    assert len(strings) == 4
+    assert strings[2] == "\u00e9t\u00e9"
+    assert strings[1] == ""
+    assert list(strings) == ["Date", "", "\u00e9t\u00e9", "Time"]
+
+
+def test_shared_strings_without_cache():
+    strings = SharedStrings(["a", "b"], cache_size=0)
+    assert strings[1] == "b"
+
+
+def test_incremental_shared_strings():
+    parsed = []
+
+    def parse():
+        for text in ["a", "", "c", "d"]:
+            parsed.append(text)
+            yield text
+
+    strings = IncrementalSharedStrings(parse())
+    assert strings[1] == ""
+    assert parsed == ["a", ""]
+    assert strings[0] == "a"
+    assert parsed == ["a", ""]
+    assert pickle.loads(pickle.dumps(strings))[3] == "d"
+    assert len(strings) == 4
+    with pytest.raises(IndexError):
+        strings[4]
+
+
+def test_indexed_shared_strings():
+    sample = BytesIO(
+        b'<?xml version="1.0"?><x:sst count="4" uniqueCount="4" '
+        + b'xmlns:x="http://schemas.openxmlformats.org/spreadsheetml/2006/'
+        + b'main"><x:si><x:t>Date</x:t></x:si>\n<x:si/><x:si><x:t>'
+        + "\u00e9t\u00e9".encode("utf-8")
+        + b"</x:t></x:si><x:si><x:t>&lt;si&gt;</x:t></x:si></x:sst>"
+    )
+    strings = IndexedSharedStrings.from_stream(sample)
+    assert len(strings) == 4
+    assert strings[3] == "<si>"
+    assert list(strings) == ["Date", "", "\u00e9t\u00e9", "<si>"]
+    assert list(pickle.loads(pickle.dumps(strings))) == list(strings)
+    strings.close()
+
+
+def test_indexed_shared_strings_empty():
+    strings = IndexedSharedStrings.from_stream(BytesIO(b""))
+    assert len(strings) == 0
+    strings.close()
+
+
+def test_spilled_shared_strings(monkeypatch):
+    monkeypatch.setattr("pyexcel_xlsxr.messy_xlsx.SPILL_BATCH_SIZE", 2)
+    texts = ["Date", "", "\u00e9t\u00e9", "Time", "x" * 100]
+    strings = SpilledSharedStrings(texts)
+    assert len(strings) == 5
+    assert list(strings) == texts
+    strings.close()
+
+
+def test_spilled_shared_strings_all_empty():
+    strings = SpilledSharedStrings(["", ""], cache_size=0)
+    assert list(strings) == ["", ""]
+    strings.close()
+
+
 def test_column_to_number_a1():
     assert column_to_number("A1") == 1
 
@@ -242,3 +455,37 @@ def test_column_to_number_aaa():
 
 def test_column_to_number_xfd():
     assert column_to_number("XFD1") == 16384
+
+
+def test_iter_rows_across_chunk_boundaries():
+    sample = (
+        b'<worksheet><sheetData><row r="1"><c r="A1"><v>1</v></c></row>'
+        b'<row r="2"><c r="A2"><v>2</v></c></row></sheetData>'
+        b"<rowBreaks/></worksheet>"
+    )
+    expected = XLSX_ROW_MATCH.findall(sample)
+    for chunk_size in (1, 3, 7, len(sample)):
+        rows = list(iter_rows(BytesIO(sample), chunk_size=chunk_size))
+        assert rows == expected
+
+
+def test_parse_date():
+    parse_date.cache_clear()
+    assert parse_date("42005", False) == datetime(2015, 1, 1)
+    assert parse_date("42005", False) == datetime(2015, 1, 1)
+    assert parse_date("40543", True) == datetime(2015, 1, 1)
+    assert parse_date.cache_info().hits == 1
+
+
+def test_parse_time():
+    parse_time.cache_clear()
+    assert parse_time("1.75") == time(18, 0, 0)
+    assert parse_time("1.75") == time(18, 0, 0)
+    assert parse_time.cache_info().hits == 1
+
+
+def test_parse_time_seconds():
+    # the seconds used to be taken from the minutes
+    assert parse_time("0.500011574074074") == time(12, 0, 1)
+    assert parse_time("0.520833333333333") == time(12, 30, 0)
+    assert parse_time("0.999988425925926") == time(23, 59, 59)
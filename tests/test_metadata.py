@@ -0,0 +1,51 @@
+import os
+import zipfile
+
+import xlsxwriter
+from pyexcel_xlsxr import get_metadata
+from pyexcel_xlsxr.messy_xlsx import dimension_size
+
+FILE_NAME = os.path.join("tests", "fixtures", "date_field.xlsx")
+
+
+def test_metadata():
+    metadata = get_metadata(FILE_NAME)
+    assert list(metadata) == ["Sheet1", "Sheet2", "Sheet3"]
+    sheet = metadata["Sheet1"]
+    assert sheet["state"] == "visible"
+    assert sheet["dimension"] == "A1:B5"
+    assert (sheet["rows"], sheet["columns"]) == (5, 2)
+    with zipfile.ZipFile(FILE_NAME) as zip_file:
+        info = zip_file.getinfo("xl/worksheets/sheet1.xml")
+    assert sheet["file_size"] == info.file_size
+    assert sheet["compress_size"] == info.compress_size
+
+
+def test_hidden_sheets_and_no_cell_data(tmp_path, monkeypatch):
+    file_name = str(tmp_path / "hidden.xlsx")
+    book = xlsxwriter.Workbook(file_name)
+    book.add_worksheet("shown").write_row(1, 1, ["a", "b", "c"])
+    book.add_worksheet("hidden").hide()
+    book.close()
+    opened = []
+    open_member = zipfile.ZipFile.open
+
+    def spy(zip_file, name, *args, **keywords):
+        opened.append(getattr(name, "filename", name))
+        return open_member(zip_file, name, *args, **keywords)
+
+    monkeypatch.setattr(zipfile.ZipFile, "open", spy)
+    with open(file_name, "rb") as workbook:
+        metadata = get_metadata(workbook.read())
+    assert metadata["shown"]["dimension"] == "B2:D2"
+    assert (metadata["shown"]["rows"], metadata["shown"]["columns"]) == (1, 3)
+    assert metadata["hidden"]["state"] == "hidden"
+    assert "xl/sharedStrings.xml" not in opened
+    assert "xl/styles.xml" not in opened
+
+
+def test_dimension_size():
+    assert dimension_size("$A$1:$AB$10") == (10, 28)
+    assert dimension_size("C3") == (1, 1)
+    assert dimension_size(None) == (None, None)
+    assert dimension_size("nonsense") == (None, None)
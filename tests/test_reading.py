@@ -1,8 +1,19 @@
 import os
+import pickle
+import re
+import zipfile
 from datetime import time, datetime
 
+import pyexcel
 from pyexcel_xlsxr import get_data
 from pyexcel_io._compact import OrderedDict
+from pyexcel_xlsxr.xlsxr import XLSXBook
+from pyexcel_xlsxr.messy_xlsx import (
+    LAZY_PARTS,
+    MappedFile,
+    XLSXBookSet,
+    pickle_for_workers,
+)
 
 
 def test_reading():
@@ -37,3 +48,258 @@ def test_reading():
     expected.update({"Sheet2": []})
     expected.update({"Sheet3": []})
     assert data == expected
+
+
+def test_reading_with_shared_strings_on_disk():
+    file_name = os.path.join("tests", "fixtures", "issue_1.xlsx")
+    data = get_data(file_name, shared_strings="disk")
+    assert data == get_data(file_name)
+
+
+def test_reading_with_indexed_shared_strings():
+    file_name = os.path.join("tests", "fixtures", "issue_1.xlsx")
+    data = get_data(file_name, shared_strings="index")
+    assert data == get_data(file_name)
+
+
+def test_reading_indexed_shared_strings_in_a_process_pool():
+    file_name = os.path.join("tests", "fixtures", "issue_1.xlsx")
+    data = get_data(file_name, shared_strings="index", workers=2)
+    assert data == get_data(file_name)
+
+
+def test_indexed_shared_strings_reach_workers_by_location():
+    file_name = os.path.join("tests", "fixtures", "issue_1.xlsx")
+    book = XLSXBookSet(file_name, shared_strings="index")
+    strings = book.shared_strings
+    with zipfile.ZipFile(file_name) as zip_file:
+        xml_size = zip_file.getinfo("xl/sharedStrings.xml").file_size
+    pickled = pickle_for_workers(book)
+    assert len(pickled) < xml_size
+    copy = pickle.loads(pickled)
+    assert list(copy.shared_strings) == list(strings)
+    copy.close()
+    book.close()
+    assert strings._files == []
+
+
+def test_indexed_shared_strings_pickle_their_xml():
+    file_name = os.path.join("tests", "fixtures", "issue_1.xlsx")
+    book = XLSXBookSet(file_name, shared_strings="index")
+    strings = list(book.shared_strings)
+    pickled = pickle.dumps(book.shared_strings)
+    book.close()
+    copy = pickle.loads(pickled)
+    assert copy.location is None
+    assert list(copy) == strings
+
+
+def test_reading_one_sheet_opens_only_its_member():
+    book = XLSXBook(
+        os.path.join("tests", "fixtures", "date_field.xlsx"), "xlsx"
+    )
+    opened = []
+    open_member = book.xlsx_book.zip_file.open
+
+    def spy(name, *args, **kwargs):
+        opened.append(name)
+        return open_member(name, *args, **kwargs)
+
+    book.xlsx_book.zip_file.open = spy
+    assert book.sheet_names() == ["Sheet1", "Sheet2", "Sheet3"]
+    assert opened == []
+    list(book.read_sheet(1).row_iterator())
+    book.close()
+    assert opened == ["xl/worksheets/sheet2.xml"]
+
+
+def test_reading_numbers_leaves_shared_strings_alone(tmp_path):
+    file_name = str(tmp_path / "mixed.xlsx")
+    pyexcel.save_book_as(
+        bookdict={"numbers": [[1, 2], [3, 4]], "text": [["a", "b"]]},
+        dest_file_name=file_name,
+    )
+    book = XLSXBook(file_name, "xlsx")
+    opened = []
+    open_member = book.xlsx_book.zip_file.open
+
+    def spy(name, *args, **kwargs):
+        opened.append(name)
+        return open_member(name, *args, **kwargs)
+
+    book.xlsx_book.zip_file.open = spy
+    assert read_sheet(book, 0) == [[1, 2], [3, 4]]
+    assert "xl/sharedStrings.xml" not in opened
+    assert read_sheet(book, 1) == [["a", "b"]]
+    book.close()
+    assert "xl/sharedStrings.xml" in opened
+
+
+def read_sheet(book, sheet_index):
+    sheet = book.read_sheet(sheet_index)
+    return [list(sheet.column_iterator(row)) for row in sheet.row_iterator()]
+
+
+def test_rows_can_be_collected_before_their_cells():
+    file_name = os.path.join("tests", "fixtures", "date_field.xlsx")
+    book = XLSXBook(file_name, "xlsx")
+    sheet = book.read_sheet(0)
+    rows = list(sheet.row_iterator())
+    data = [list(sheet.column_iterator(row)) for row in rows]
+    book.close()
+    assert data == get_data(file_name)["Sheet1"]
+
+
+def test_reading_with_mmap():
+    file_name = os.path.join("tests", "fixtures", "date_field.xlsx")
+    data = get_data(file_name, use_mmap=True)
+    assert data == get_data(file_name)
+
+
+def test_reading_stored_members_with_mmap(tmp_path):
+    file_name = os.path.join("tests", "fixtures", "date_field.xlsx")
+    stored_file = str(tmp_path / "stored.xlsx")
+    with zipfile.ZipFile(file_name) as source:
+        with zipfile.ZipFile(stored_file, "w", zipfile.ZIP_STORED) as target:
+            for info in source.infolist():
+                target.writestr(info.filename, source.read(info))
+    book = XLSXBookSet(stored_file, use_mmap=True)
+    with book.open_member("xl/worksheets/sheet1.xml") as member:
+        assert isinstance(member, MappedFile)
+    book.close()
+    assert get_data(stored_file, use_mmap=True) == get_data(file_name)
+
+
+def test_reading_sheets_in_a_process_pool():
+    file_name = os.path.join("tests", "fixtures", "date_field.xlsx")
+    data = get_data(file_name, workers=2)
+    assert data == get_data(file_name)
+
+
+def test_reading_sheet_chunks_in_a_process_pool():
+    file_name = os.path.join("tests", "fixtures", "issue_1.xlsx")
+    data = get_data(file_name, workers=2, sheet_chunk_size=256)
+    assert data == get_data(file_name)
+
+
+def rewrite_sheet(tmp_path, rewrite):
+    file_name = str(tmp_path / "rewritten.xlsx")
+    rows = [[index, "row %d" % index] for index in range(50)]
+    pyexcel.save_as(array=rows, dest_file_name=str(tmp_path / "source.xlsx"))
+    with zipfile.ZipFile(str(tmp_path / "source.xlsx")) as source:
+        with zipfile.ZipFile(file_name, "w", zipfile.ZIP_DEFLATED) as target:
+            for info in source.infolist():
+                content = source.read(info)
+                if info.filename == "xl/worksheets/sheet1.xml":
+                    content = rewrite(content)
+                target.writestr(info.filename, content)
+    return file_name
+
+
+def prefix_tags(content):
+    content = content.replace(b' xmlns="', b' xmlns:x="')
+    return re.sub(rb"<(/?)(\w+)([\s/>])", rb"<\1x:\2\3", content)
+
+
+def add_self_closing_rows(content):
+    return content.replace(
+        b"</sheetData>", b'<row r="60"/><row r="61" spans="1:1"/></sheetData>'
+    )
+
+
+def test_reading_sheet_chunks_with_prefixed_rows(tmp_path):
+    file_name = rewrite_sheet(tmp_path, prefix_tags)
+    expected = get_data(file_name)
+    assert len(expected["pyexcel_sheet1"]) == 50
+    assert get_data(file_name, workers=2, sheet_chunk_size=100) == expected
+
+
+def test_reading_sheet_chunks_with_self_closing_rows(tmp_path):
+    file_name = rewrite_sheet(tmp_path, add_self_closing_rows)
+    expected = get_data(file_name)
+    assert len(expected["pyexcel_sheet1"]) == 52
+    assert get_data(file_name, workers=2, sheet_chunk_size=100) == expected
+
+
+def test_reading_columns_in_a_process_pool():
+    file_name = os.path.join("tests", "fixtures", "issue_1.xlsx")
+    for keywords in [{}, {"sheet_chunk_size": 256}]:
+        data = get_data(file_name, workers=2, columns=[1, 0], **keywords)
+        assert data == get_data(file_name, columns=[1, 0])
+
+
+def test_process_pool_receives_parsed_parts():
+    file_name = os.path.join("tests", "fixtures", "issue_1.xlsx")
+    book = XLSXBookSet(file_name)
+    book.make_pool(1).shutdown()
+    pickled_book = pickle.loads(pickle.dumps(book))
+    for name in LAZY_PARTS:
+        assert name in vars(pickled_book)
+    assert pickled_book.shared_strings[0] == book.shared_strings[0]
+    pickled_book.close()
+    book.close()
+
+
+def test_reading_a_stream_ignores_workers():
+    file_name = os.path.join("tests", "fixtures", "date_field.xlsx")
+    with open(file_name, "rb") as stream:
+        book = XLSXBook(stream, "xlsx", workers=2)
+        sheet = book.read_sheet(0)
+        assert book._pool is None
+        assert len(list(sheet.row_iterator())) == 5
+        book.close()
+
+
+def test_pickled_book_reopens_its_file():
+    file_name = os.path.join("tests", "fixtures", "issue_1.xlsx")
+    book = XLSXBookSet(file_name, shared_strings="disk")
+    copy = pickle.loads(pickle.dumps(book))
+    assert list(copy.shared_strings) == list(book.shared_strings)
+    table = next(copy.make_tables())
+    assert list(table.raw()) == list(next(book.make_tables()).raw())
+    copy.close()
+    book.close()
+
+
+def test_reading_row_blocks():
+    file_name = os.path.join("tests", "fixtures", "issue_1.xlsx")
+    expected = list(get_data(file_name).values())[0]
+    book = XLSXBook(file_name, "xlsx")
+    blocks = list(book.read_sheet(0).iter_row_blocks(size=2))
+    book.close()
+    assert all(len(block) <= 2 for block in blocks)
+    assert [row for block in blocks for row in block] == expected
+
+
+def test_reading_row_blocks_in_a_process_pool():
+    file_name = os.path.join("tests", "fixtures", "issue_1.xlsx")
+    book = XLSXBook(file_name, "xlsx")
+    expected = list(book.read_sheet(0).iter_row_blocks())
+    book.close()
+    book = XLSXBook(file_name, "xlsx", workers=2)
+    assert list(book.read_sheet(0).iter_row_blocks()) == expected
+    book.close()
+
+
+def test_reading_raw_row_blocks():
+    file_name = os.path.join("tests", "fixtures", "date_field.xlsx")
+    book = XLSXBookSet(file_name)
+    table = next(book.make_tables())
+    blocks = list(table.iter_row_blocks(size=3))
+    book.close()
+    assert [len(block) for block in blocks] == [3, 2]
+    assert blocks[0][0] == ["Date", "Time"]
+
+
+def test_text_cells_are_not_sniffed(tmp_path):
+    file_name = str(tmp_path / "typed.xlsx")
+    pyexcel.save_as(
+        array=[["00123", "123", 123, 1.5]], dest_file_name=file_name
+    )
+    assert get_data(file_name)["pyexcel_sheet1"] == [
+        ["00123", "123", 123, 1.5]
+    ]
+    data = get_data(file_name, auto_detect_int=False)
+    assert data["pyexcel_sheet1"] == [["00123", "123", 123.0, 1.5]]
+    data = get_data(file_name, auto_detect_int=False, auto_detect_float=False)
+    assert data["pyexcel_sheet1"] == [["00123", "123", "123", "1.5"]]
@@ -0,0 +1,100 @@
+import os
+
+import pytest
+import pyexcel
+from pyexcel_xlsxr import get_data, messy_xlsx
+from pyexcel_xlsxr.messy_xlsx import RowIndex, XLSXBookSet
+
+START = [0, 1, 17, 150, 298, 299, 300]
+
+
+@pytest.fixture
+def tall_file(tmp_path, monkeypatch):
+    monkeypatch.setattr("pyexcel_xlsxr.messy_xlsx.ROW_INDEX_INTERVAL", 512)
+    file_name = str(tmp_path / "tall.xlsx")
+    rows = [[index, "row %d" % index, index * 1.5] for index in range(300)]
+    pyexcel.save_as(array=rows, dest_file_name=file_name)
+    return file_name
+
+
+def read_rows(file_name, **keywords):
+    book = XLSXBookSet(file_name, **keywords)
+    table = next(book.make_tables())
+    rows = [list(table.raw(start_row=start, row_limit=3)) for start in START]
+    book.close()
+    return rows
+
+
+def test_start_row_with_row_index(tall_file):
+    expected = read_rows(tall_file)
+    assert read_rows(tall_file, row_index=True) == expected
+    assert os.path.exists(tall_file + ".sheet1.xml.rowindex")
+
+
+def test_start_row_with_persisted_row_index(tall_file, tmp_path):
+    index_dir = str(tmp_path / "indexes")
+    os.mkdir(index_dir)
+    expected = read_rows(tall_file)
+    read_rows(tall_file, row_index=True, row_index_dir=index_dir)
+    assert len(os.listdir(index_dir)) == 1
+    assert (
+        read_rows(tall_file, row_index=True, row_index_dir=index_dir)
+        == expected
+    )
+
+
+def test_get_data_seeks_with_row_index(tall_file, monkeypatch):
+    expected = get_data(tall_file, start_row=250, row_limit=3)
+    parsed = []
+    iter_sheet_rows = messy_xlsx.iter_sheet_rows
+
+    def spy(stream):
+        for row in iter_sheet_rows(stream):
+            parsed.append(row)
+            yield row
+
+    monkeypatch.setattr(messy_xlsx, "iter_sheet_rows", spy)
+    data = get_data(tall_file, start_row=250, row_limit=3, row_index=True)
+    assert data == expected
+    assert list(data.values())[0][0][0] == 250
+    # the first read builds the index, the second one seeks with it
+    del parsed[:]
+    get_data(tall_file, start_row=250, row_limit=3, row_index=True)
+    assert len(parsed) < 250
+
+
+def test_row_index_checkpoints(tall_file):
+    book = XLSXBookSet(tall_file, row_index=True)
+    table = next(book.make_tables())
+    row_index = table.row_index()
+    assert len(row_index.ordinals) > 5
+    assert len(row_index.checkpoints) == len(row_index.ordinals)
+    ordinal, offset, checkpoint = row_index.find(200)
+    assert ordinal <= 200
+    assert checkpoint is not None
+    book.close()
+
+
+def test_row_index_resumes_inside_chunks(tall_file, monkeypatch):
+    expected = read_rows(tall_file)
+    # many compressed chunks, with indexed rows in the middle of them
+    monkeypatch.setattr(messy_xlsx, "CHUNK_SIZE", 256)
+    book = XLSXBookSet(tall_file, row_index=True)
+    table = next(book.make_tables())
+    row_index = table.row_index()
+    assert len(row_index.checkpoints) > 5
+    for position, decompressor, skip in row_index.checkpoints.values():
+        assert isinstance(skip, int)
+    rows = [list(table.raw(start_row=start, row_limit=3)) for start in START]
+    book.close()
+    assert rows == expected
+
+
+def test_stale_row_index_is_ignored(tall_file):
+    book = XLSXBookSet(tall_file, row_index=True)
+    table = next(book.make_tables())
+    table.row_index()
+    info = book.zip_file.getinfo(table.sheet_file)
+    info.CRC += 1
+    assert RowIndex.load(tall_file + ".sheet1.xml.rowindex", info) is None
+    book.close()
@@ -0,0 +1,84 @@
+import os
+import shutil
+from datetime import time, datetime
+
+import pytest
+from pyexcel_xlsxr import get_data, messy_xlsx
+from pyexcel_xlsxr.sidecar import load_sidecar, save_sidecar
+
+FILE_NAME = os.path.join("tests", "fixtures", "date_field.xlsx")
+SIGNATURE = [1, 2, 3, 4]
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    file_name = str(tmp_path / "date_field.xlsx")
+    shutil.copy(FILE_NAME, file_name)
+    return file_name
+
+
+def no_xml(stream):
+    raise AssertionError("the sheet xml was read again")
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "rows.sidecar")
+    rows = [
+        ["text", "ünïcode", 1, -(2**70), 1.5],
+        [datetime(2020, 2, 29, 12, 30, 1, 5), time(23, 59, 59, 999999)],
+        [],
+        ["", "text", "", 3],
+        [None, "", None, 5],
+    ]
+    save_sidecar(path, rows, SIGNATURE, 1)
+    assert list(load_sidecar(path, SIGNATURE, 1)) == rows
+
+
+def test_unexpected_values_are_refused(tmp_path):
+    path = str(tmp_path / "rows.sidecar")
+    with pytest.raises(TypeError):
+        save_sidecar(path, [[object()]], SIGNATURE, 1)
+
+
+def test_stale_sidecar_is_ignored(tmp_path):
+    path = str(tmp_path / "rows.sidecar")
+    save_sidecar(path, [[1]], SIGNATURE, 1)
+    assert load_sidecar(path, [1, 2, 3, 5], 1) is None
+    assert load_sidecar(path, SIGNATURE, 2) is None
+    assert load_sidecar(path + ".missing", SIGNATURE, 1) is None
+
+
+def test_sheet_is_read_from_sidecar(workbook, monkeypatch):
+    expected = get_data(FILE_NAME)
+    assert get_data(workbook, sidecar=True) == expected
+    assert os.path.exists(workbook + ".sheet1.xml.sidecar")
+    monkeypatch.setattr(messy_xlsx, "iter_sheet_rows", no_xml)
+    assert get_data(workbook, sidecar=True) == expected
+
+
+def test_sidecar_dir(workbook, tmp_path, monkeypatch):
+    sidecar_dir = str(tmp_path / "sidecars")
+    os.mkdir(sidecar_dir)
+    expected = get_data(workbook, sidecar=True, sidecar_dir=sidecar_dir)
+    assert len(os.listdir(sidecar_dir)) == len(expected)
+    monkeypatch.setattr(messy_xlsx, "iter_sheet_rows", no_xml)
+    assert get_data(workbook, sidecar=True, sidecar_dir=sidecar_dir) == (
+        expected
+    )
+
+
+def test_copies_do_not_share_sidecars(workbook, tmp_path):
+    sidecar_dir = str(tmp_path / "sidecars")
+    os.mkdir(sidecar_dir)
+    copy = str(tmp_path / "copy.xlsx")
+    shutil.copy(workbook, copy)
+    get_data(workbook, sidecar=True, sidecar_dir=sidecar_dir)
+    get_data(copy, sidecar=True, sidecar_dir=sidecar_dir)
+    assert len(os.listdir(sidecar_dir)) == 6
+
+
+def test_changed_sheet_is_read_again(workbook):
+    get_data(workbook, sidecar=True)
+    sidecar = workbook + ".sheet1.xml.sidecar"
+    save_sidecar(sidecar, [["stale"]], [0, 0, 0, 0], 1)
+    assert get_data(workbook, sidecar=True) == get_data(FILE_NAME)
@@ -1,7 +1,9 @@
 import os
+from io import BytesIO
 
 import pyexcel
 from base import create_sample_file1
+from pyexcel_xlsxr.messy_xlsx import XLSXBookSet
 
 
 class TestStringIO:
@@ -30,3 +32,41 @@ class TestStringIO:
         result = [1, 2, 3, 4, 5, 6]
         actual = list(r.enumerate())
         assert result == actual
+
+
+class NonSeekableStream:
+    def __init__(self, content):
+        self.stream = BytesIO(content)
+
+    def read(self, size=-1):
+        return self.stream.read(size)
+
+    def seekable(self):
+        return False
+
+
+class TestStreams:
+    def setup_method(self):
+        io = pyexcel.save_as(dest_file_type="xlsx", array=[[1, 2], [3, 4]])
+        self.content = io.getvalue()
+
+    def test_seekable_stream_is_used_as_is(self):
+        stream = BytesIO(self.content)
+        book = XLSXBookSet(stream)
+        assert book.zip_file.fp is stream
+        assert book.spooled_file is None
+        book.close()
+
+    def test_non_seekable_stream_is_spooled(self):
+        book = XLSXBookSet(NonSeekableStream(self.content))
+        assert book.spooled_file is not None
+        table = next(book.make_tables())
+        assert list(table.raw()) == [[1, 2], [3, 4]]
+        book.close()
+
+    def test_non_seekable_stream_spools_to_disk(self):
+        book = XLSXBookSet(
+            NonSeekableStream(self.content), spool_threshold=10
+        )
+        assert book.spooled_file._rolled
+        book.close()